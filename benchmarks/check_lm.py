@@ -0,0 +1,90 @@
+"""Check batch_levenberg_marquardt against per-series curve_fit.
+
+Usage (from the repository root):
+    python -m benchmarks.check_lm
+    python -m benchmarks.check_lm --series 2000 --tol 1e-5
+
+Fits noisy sines with amplitude in [2, 4] and frequency in [1.2, 1.8] from the
+solver's default p0, both in one batch and one series at a time with
+curve_fit, and compares the results. Where curve_fit reaches the noise floor,
+the batch fit must match its parameters (phase modulo 2*pi) within --tol and
+must not end at a higher cost. From this p0 curve_fit also drifts into the
+degenerate large-amplitude, low-frequency valley for some series. Both
+solvers crawl along that valley, so there the batch cost only has to be
+within --valley-rtol of curve_fit's. Series where curve_fit raises are
+skipped. Exits with status 1 on any mismatch.
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201, C0415
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+
+def make_series(n_series, n_points=100, noise=0.3, seed=0):
+    """Noisy sines on x in [0, 10], one per row."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 10, n_points)
+    amplitude = rng.uniform(2, 4, n_series)[:, None]
+    frequency = rng.uniform(1.2, 1.8, n_series)[:, None]
+    phase = rng.uniform(-np.pi, np.pi, n_series)[:, None]
+    offset = rng.normal(0, 1, n_series)[:, None]
+    Y = amplitude * np.sin(frequency * x + phase) + offset + rng.normal(0, noise, (n_series, n_points))
+    return x, Y
+
+
+def main(argv=None):
+    from scipy.optimize import curve_fit
+
+    from trading_automation.curve_fitting_comparison import (batch_levenberg_marquardt, model_function,
+                                                              model_jacobian)
+
+    parser = argparse.ArgumentParser(description="Compare batch_levenberg_marquardt with curve_fit.")
+    parser.add_argument("--series", type=int, default=2000, help="Number of series to fit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tol", type=float, default=1e-5, help="Parameter tolerance on good fits")
+    parser.add_argument("--valley-rtol", type=float, default=1e-3,
+                        help="Relative cost tolerance where curve_fit stays in the degenerate valley")
+    args = parser.parse_args(argv)
+
+    p0 = (2, 1, 0, 0)
+    noise = 0.3
+    x, Y = make_series(args.series, noise=noise, seed=args.seed)
+
+    start = time.perf_counter()
+    popt, converged, _, cost = batch_levenberg_marquardt(x, Y, p0=p0)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ref = np.full_like(popt, np.nan)
+    for i, y in enumerate(Y):
+        try:
+            ref[i], _ = curve_fit(model_function, x, y, p0=p0, jac=model_jacobian)
+        except RuntimeError:
+            pass  # curve_fit ran out of evaluations, nothing to compare against
+    ref_cost = np.sum((Y - model_function(x, *(ref[:, k, None] for k in range(4))))**2, axis=1)
+    ref_seconds = time.perf_counter() - start
+
+    diff = np.abs(popt - ref)
+    diff[:, 2] = np.abs(np.angle(np.exp(1j * (popt[:, 2] - ref[:, 2]))))
+    # A fit at the noise floor leaves a cost near n_points * noise**2
+    good = ref_cost < 2 * x.size * noise**2
+
+    mismatched = good & ((diff.max(axis=1) > args.tol) | (cost > ref_cost * (1 + 1e-9)))
+    valley_worse = ~good & (cost > ref_cost * (1 + args.valley_rtol))
+    failed = np.isnan(ref_cost)
+
+    print(f"batch {batch_seconds:.2f}s, curve_fit {ref_seconds:.2f}s over {args.series} series")
+    print(f"curve_fit at the noise floor: {good.sum()}, batch at the noise floor: {(cost < 2 * x.size * noise**2).sum()}")
+    print(f"not converged: {(~converged).sum()}, curve_fit failures skipped: {failed.sum()}")
+    print(f"mismatches on good fits: {mismatched.sum()} (max parameter difference {diff[good].max(initial=0):.2e})")
+    print(f"valley fits worse than curve_fit by over {args.valley_rtol:g}: {valley_worse.sum()}")
+    return 1 if mismatched.any() or valley_worse.any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Benchmarks for the hot functions in trading_automation.
+
+Usage (from the repository root):
+    python -m benchmarks.run                                   # time and print scaling curves
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.25
+
+Inputs are deterministic OHLC bars generated from a fixed seed, at sizes from
+1e3 to 1e7 bars. Each function has its own size cap because some of them are
+pure Python loops or quadratic in the number of bars. Raise it with --max-bars.
+Each timing calls the function repeatedly for at least --min-time seconds
+and keeps the fastest call, and the --repeat timings of every case are taken
+in interleaved rounds. Comparing against a baseline exits with status 1 when
+any (function, size) is slower than the baseline by more than the threshold
+and by more than --floor seconds.
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201, C0415
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# Weekday hours per year produced by generate_realistic_stock_data
+BARS_PER_YEAR = 261 * 24
+
+
+def make_ohlc(n, seed=0):
+    """Deterministic OHLC bars with lower-case columns and a RangeIndex."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.empty(n)
+    open_[0] = 100
+    open_[1:] = close[:-1]
+    spread = np.abs(rng.normal(0, 0.001, (2, n))) * close
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + spread[0],
+        "low": np.minimum(open_, close) - spread[1],
+        "close": close,
+    })
+
+
+def _sar_case(n):
+    from trading_automation.psar import parabolic_sar
+
+    bars = make_ohlc(n).rename(columns=str.capitalize)
+    return parabolic_sar, lambda: (bars.copy(),)
+
+
+def _sutte_case(n):
+    from trading_automation.sutte_indicator_example import calculate_sutte
+
+    bars = make_ohlc(n)[["close", "high", "low"]]
+    return calculate_sutte, lambda: (bars.copy(),)
+
+
+def _sure_ohlc_case(n):
+    from trading_automation.support_resistance_analysis import get_sure_OHLC
+
+    bars = make_ohlc(n)[["high", "low"]]
+    # intervals=[] times the clustering and level filtering without the per-row lookup
+    return get_sure_OHLC, lambda: (bars.copy(), [])
+
+
+def _change_points_case(n):
+    from trading_automation.structural_break import detect_change_points
+
+    points = make_ohlc(n)["close"].to_numpy()
+    return detect_change_points, lambda: (points, "Binseg")
+
+
+def _synthetic_case(n):
+    from trading_automation.gen_syntheticdata import generate_realistic_stock_data
+
+    def args():
+        np.random.seed(0)
+        return (n / BARS_PER_YEAR,)
+    return generate_realistic_stock_data, args
+
+
+def _moving_averages_case(n):
+    from trading_automation.compare_ma import calculate_moving_averages
+
+    bars = make_ohlc(n)[["close"]].rename(columns={"close": "Close"})
+    return calculate_moving_averages, lambda: (bars.copy(),)
+
+
+# name -> (case factory, largest size run by default)
+BENCHMARKS = {
+    "parabolic_sar": (_sar_case, 10_000),
+    "calculate_sutte": (_sutte_case, 10_000_000),
+    "get_sure_OHLC": (_sure_ohlc_case, 10_000),
+    "detect_change_points": (_change_points_case, 100_000),
+    "generate_realistic_stock_data": (_synthetic_case, 1_000_000),
+    "calculate_moving_averages": (_moving_averages_case, 1_000_000),
+}
+
+
+def time_call(func, make_args, repeat, min_time=0.2):
+    """
+    Fastest of the wall-clock timings of repeated calls. Arguments are rebuilt outside the timed region.
+
+    Each of the `repeat` measurements keeps calling `func` until it has spent
+    at least `min_time` seconds, as timeit.Timer.autorange does, and every
+    call is timed on its own. Keeping the fastest call, rather than the mean
+    of a loop, discards calls slowed by scheduler noise, which on
+    millisecond-scale work is as large as the differences being measured.
+    The garbage collector is paused while timing, as in timeit.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        spent = 0.0
+        while True:
+            args = make_args()
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                func(*args)
+                elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            best = min(best, elapsed)
+            spent += elapsed
+            if spent >= min_time:
+                break
+    return best
+
+
+def scaling_exponent(timings):
+    """Slope of log(time) against log(bars); 1.0 is linear scaling."""
+    sizes = sorted(timings, key=int)
+    if len(sizes) < 2:
+        return None
+    x = np.log([int(n) for n in sizes])
+    y = np.log([max(timings[n], 1e-9) for n in sizes])
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def run_benchmarks(names, sizes, repeat=3, max_bars=None, min_time=0.2):
+    """
+    Time each benchmark at each size within its cap.
+
+    The `repeat` timings of each (benchmark, size) are taken in separate
+    rounds over all cases rather than back to back, so a burst of machine
+    load slows one sample of many cases instead of every sample of one.
+
+    Returns:
+    - Dict mapping benchmark name to {"timings": {size: seconds}, "exponent": float}
+      or {"skipped": reason} when its dependencies are missing.
+    """
+    results = {}
+    cases = []
+    for name in names:
+        factory, cap = BENCHMARKS[name]
+        cap = max_bars or cap
+        try:
+            # Untimed warm-up so lazy imports and first-call setup are not billed to the smallest size
+            func, make_args = factory(min(sizes[0], cap))
+            func(*make_args())
+        except ImportError as ex:
+            results[name] = {"skipped": f"{type(ex).__name__}: {ex}"}
+            print(f"{name:32s} skipped ({ex})", file=sys.stderr)
+            continue
+        results[name] = {"timings": {}}
+        cases.extend((name, n) for n in sizes if n <= cap)
+
+    for round_ in range(repeat):
+        for name, n in cases:
+            func, make_args = BENCHMARKS[name][0](n)
+            seconds = time_call(func, make_args, 1, min_time)
+            timings = results[name]["timings"]
+            timings[str(n)] = min(seconds, timings.get(str(n), float("inf")))
+            print(f"[{round_ + 1}/{repeat}] {name:32s} {n:>10d} bars {seconds:10.4f}s", file=sys.stderr)
+
+    for result in results.values():
+        if "timings" in result:
+            result["exponent"] = scaling_exponent(result["timings"])
+    return results
+
+
+def compare(results, baseline, threshold, overrides=None, floor=0.05):
+    """
+    Compare timings against a baseline.
+
+    A slowdown smaller than `floor` seconds is never reported, so noise on
+    millisecond-scale calls cannot fail the gate whatever its relative size.
+
+    Returns:
+    - List of (name, size, baseline seconds, current seconds, ratio) for every
+      measurement slower than the baseline by more than its threshold.
+    """
+    overrides = overrides or {}
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name, {}).get("timings", {})
+        limit = 1 + overrides.get(name, threshold)
+        for n, seconds in result.get("timings", {}).items():
+            if n in base and seconds > base[n] * limit and seconds - base[n] > floor:
+                regressions.append((name, int(n), base[n], seconds, seconds / base[n]))
+    return regressions
+
+
+def _parse_overrides(values):
+    overrides = {}
+    for value in values or []:
+        name, _, limit = value.partition("=")
+        overrides[name] = float(limit)
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark trading_automation hot functions.")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="Benchmarks to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="Bar counts to time")
+    parser.add_argument("--max-bars", type=int, default=None,
+                        help="Override every benchmark's size cap")
+    parser.add_argument("--repeat", type=int, default=3, help="Rounds of timings per size, the fastest call is kept")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Keep calling a function for this many seconds per timing (default: 0.2)")
+    parser.add_argument("--output", help="Write this run's results as JSON")
+    parser.add_argument("--save-baseline", help="Write this run's results as the new baseline")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown as a fraction of the baseline (default: 0.25)")
+    parser.add_argument("--threshold-for", nargs="*", metavar="NAME=FRACTION",
+                        help="Per-benchmark threshold overrides")
+    parser.add_argument("--floor", type=float, default=0.05,
+                        help="Ignore slowdowns smaller than this many seconds (default: 0.05)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, sorted(args.sizes), repeat=args.repeat, max_bars=args.max_bars,
+                             min_time=args.min_time)
+    doc = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "results": results,
+    }
+
+    print(f"\n{'benchmark':32s} {'exponent':>9s}  timings")
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:32s} {'skipped':>9s}  {result['skipped']}")
+            continue
+        exponent = result["exponent"]
+        curve = ", ".join(f"{int(n):.0e}:{s:.4f}s" for n, s in result["timings"].items())
+        print(f"{name:32s} {exponent if exponent is not None else float('nan'):9.2f}  {curve}")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(doc, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold, _parse_overrides(args.threshold_for), args.floor)
+        for name, n, base, seconds, ratio in regressions:
+            print(f"REGRESSION {name} at {n} bars: {base:.4f}s -> {seconds:.4f}s ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond the threshold against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+"""Trading automation scripts as an importable package.
+
+Compute functions are re-exported lazily: ``from trading_automation import
+parabolic_sar`` imports only :mod:`trading_automation.psar`, and
+plotting, clustering, change-point and download libraries are imported inside
+the functions that need them. Each script keeps its original behaviour behind
+``python -m trading_automation.<script>``.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "evaluate_positions": "backtest",
+    "BarStore": "barstore",
+    "ResultCache": "cache",
+    "BarAggregator": "streaming",
+    "memoize": "cache",
+    "normalise_columns": "barstore",
+    "sin_cos_mat": "angle_norm_comparison",
+    "lp_norm": "angle_norm_comparison",
+    "huber_norm": "angle_norm_comparison",
+    "loss_tensor": "angle_norm_comparison",
+    "loss_frame": "angle_norm_comparison",
+    "load_prices": "angle_variation",
+    "calculate_angles": "angle_variation",
+    "generate_stock_data": "compare_ma",
+    "calculate_moving_averages": "compare_ma",
+    "model_function": "curve_fitting_comparison",
+    "model_jacobian": "curve_fitting_comparison",
+    "rolling_sine_fit": "curve_fitting_comparison",
+    "batch_levenberg_marquardt": "curve_fitting_comparison",
+    "generate_realistic_stock_data": "gen_syntheticdata",
+    "save_to_csv": "gen_syntheticdata",
+    "parabolic_sar": "psar",
+    "signal_generation": "psar",
+    "get_stock_data": "structural_break",
+    "estimate_pen": "structural_break",
+    "estimate_n_bkps": "structural_break",
+    "detect_change_points": "structural_break",
+    "score_method": "structural_break",
+    "extract_up_down_points": "structural_break",
+    "get_cluster": "support_resistance_analysis",
+    "get_sure_OHLC": "support_resistance_analysis",
+    "calculate_sutte": "sutte_indicator_example",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
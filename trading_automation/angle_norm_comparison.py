@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from .instrumentation import emit, stage
+
+# Initialize variables
+data_vec = np.array([1, 4])
+N_grid = 201
+param_grid = np.linspace(0, 2*np.pi, N_grid)
+
+LOSS_NAMES = ('angle', 'sin_cos')
+
+# Define sine-cosine matrix function
+def sin_cos_mat(x):
+    return np.column_stack((np.sin(x), np.cos(x)))
+
+# Define norm factories
+def lp_norm(p):
+    """Elementwise Lp penalty |x|**p."""
+    return lambda x: np.abs(x)**p
+
+def huber_norm(delta=1.0):
+    """Elementwise Huber penalty, quadratic inside `delta` and linear outside."""
+    def huber(x):
+        a = np.abs(x)
+        return np.where(a <= delta, 0.5 * a**2, delta * (a - 0.5 * delta))
+    return huber
+
+# Define norms
+norms = {
+    'L1': lp_norm(1),
+    'L2': lp_norm(2),
+}
+
+def loss_tensor(data_vals, param_grid, norms, chunk_size=1024):
+    """
+    Compute every loss with NumPy broadcasting.
+
+    Parameters:
+    - data_vals: Observed angle or angles.
+    - param_grid: Candidate angles to evaluate.
+    - norms: Mapping of norm name to an elementwise penalty function.
+    - chunk_size: Number of data values broadcast at once, bounding memory to
+      roughly chunk_size * len(param_grid) * 2 floats per norm.
+
+    Returns:
+    - Array of shape (len(data_vals), len(norms), len(LOSS_NAMES), len(param_grid)).
+    """
+    data_vals = np.atleast_1d(np.asarray(data_vals, dtype=float))
+    param_grid = np.asarray(param_grid, dtype=float)
+    grid_sc = sin_cos_mat(param_grid)
+
+    losses = np.empty((len(data_vals), len(norms), len(LOSS_NAMES), len(param_grid)))
+    for start in range(0, len(data_vals), chunk_size):
+        chunk = data_vals[start:start + chunk_size]
+        stop = start + len(chunk)
+
+        d = np.abs(chunk[:, None] - param_grid[None, :])
+        angle_dist = np.where(d > np.pi, 2*np.pi - d, d)
+        sc_dist = np.abs(grid_sc[None, :, :] - sin_cos_mat(chunk)[:, None, :])
+
+        for j, norm_fun in enumerate(norms.values()):
+            losses[start:stop, j, 0] = norm_fun(angle_dist)
+            losses[start:stop, j, 1] = np.sum(norm_fun(sc_dist), axis=2)
+
+    return losses
+
+def loss_frame(data_vals, param_grid, norms, chunk_size=1024):
+    """Long-format DataFrame of `loss_tensor`, built with a single reshape."""
+    data_vals = np.atleast_1d(data_vals)
+    param_grid = np.asarray(param_grid)
+    losses = loss_tensor(data_vals, param_grid, norms, chunk_size=chunk_size)
+    n_data, n_norms, n_losses, n_grid = losses.shape
+
+    norm_codes = np.repeat(np.arange(n_norms), n_losses * n_grid)
+    loss_codes = np.repeat(np.arange(n_losses), n_grid)
+    return pd.DataFrame({
+        'data_val': np.repeat(data_vals, n_norms * n_losses * n_grid),
+        'norm_name': pd.Categorical.from_codes(np.tile(norm_codes, n_data), categories=list(norms)),
+        'param_grid': np.tile(param_grid, n_data * n_norms * n_losses),
+        'loss_name': pd.Categorical.from_codes(np.tile(loss_codes, n_data * n_norms), categories=list(LOSS_NAMES)),
+        'loss_value': losses.reshape(-1),
+    })
+
+def plot_loss_surface(loss_df, filename='figure-loss-python.png'):
+    """Facet the loss table by norm and data value, save it and show it."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 6))
+    g = sns.FacetGrid(loss_df, row='norm_name', col='data_val', hue='loss_name', margin_titles=True, sharey=False)
+    g.map(sns.scatterplot, 'param_grid', 'loss_value')
+    g.add_legend()
+
+    # Save the plot
+    plt.savefig(filename)
+    plt.show()
+
+def main():
+    # Build the loss table
+    with stage("compute", rows=len(data_vec)):
+        loss_df = loss_frame(data_vec, param_grid, norms)
+
+    # Plotting
+    with stage("plot", rows=len(loss_df)):
+        plot_loss_surface(loss_df)
+
+    emit("angle_norm_comparison")
+
+if __name__ == '__main__':
+    main()
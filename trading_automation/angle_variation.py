@@ -24,16 +24,16 @@ SOFTWARE.
 # Copyright : Copyright (c) 2024 James Sawyer
 
 
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from tabulate import tabulate
+
+from .instrumentation import emit, stage
 
 DATE_FORMAT = "%Y:%m:%d-%H:%M:%S"
 
-if __name__ == "__main__":
-    stock_data = pd.read_csv("backtest_prices.csv")
+
+def load_prices(csv_file):
+    stock_data = pd.read_csv(csv_file)
     stock_data["snapshotTime"] = pd.to_datetime(
         stock_data["snapshotTime"],
         format=DATE_FORMAT,
@@ -57,10 +57,10 @@ if __name__ == "__main__":
 
     # Create a new column for the index
     stock_data["Index"] = range(1, len(stock_data) + 1)
+    return stock_data
 
-    # print with tabulate
-    print(tabulate(stock_data, headers="keys", tablefmt="pretty"))
 
+def calculate_angles(stock_data):
     # calculate the slopes
     stock_data["delta_x"] = stock_data.index
     # Calculate the difference between the close prices
@@ -73,6 +73,11 @@ if __name__ == "__main__":
 
     # convert to numpy float64 and round to 2 decimal places
     stock_data["angles"] = stock_data["angles"].astype(np.float64).round(2)
+    return stock_data
+
+
+def plot_angles(stock_data):
+    import matplotlib.pyplot as plt
 
     # plot the close prices and a line with the angles
     fig, ax = plt.subplots()
@@ -89,4 +94,27 @@ if __name__ == "__main__":
     ax.set_xlabel("Index")
     ax.set_ylabel("Angles")
     ax.legend()
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+
+def main():
+    from tabulate import tabulate
+
+    with stage("load") as s:
+        stock_data = load_prices("backtest_prices.csv")
+        s.rows = len(stock_data)
+
+    # print with tabulate
+    print(tabulate(stock_data, headers="keys", tablefmt="pretty"))
+
+    with stage("compute", rows=len(stock_data)):
+        stock_data = calculate_angles(stock_data)
+
+    with stage("plot", rows=len(stock_data)):
+        plot_angles(stock_data)
+
+    emit("angle_variation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Vectorised backtest evaluation for indicator positions.
+
+evaluate_positions() turns the position columns produced by an indicator,
+such as the 'positions' of parabolic_sar.signal_generation, into returns,
+costs, drawdowns and trade statistics. Every column is evaluated at once with
+array operations, so a parameter sweep of hundreds of position columns
+against one price series is a single call.
+
+A position held at bar t earns the return from close t to close t+1, so
+positions computed from bar t's close never trade on information from the
+future. Costs are charged on turnover at the bar where the position changes.
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201
+
+import numpy as np
+import pandas as pd
+
+STATS_COLUMNS = ("total_return", "annual_return", "annual_volatility", "sharpe", "max_drawdown", "exposure",
+                 "turnover", "costs", "n_trades", "win_rate", "avg_trade_return", "avg_bars_held")
+YEAR_NS = int(365.25 * 24 * 3600 * 1e9)
+
+
+def _as_matrix(positions):
+    """Return (n, k) float positions and their column names."""
+    if isinstance(positions, pd.DataFrame):
+        return positions.to_numpy(dtype=float), list(positions.columns)
+    if isinstance(positions, pd.Series):
+        return positions.to_numpy(dtype=float)[:, None], [positions.name or "positions"]
+    matrix = np.asarray(positions, dtype=float)
+    if matrix.ndim == 1:
+        return matrix[:, None], ["positions"]
+    return matrix, list(range(matrix.shape[1]))
+
+
+def infer_periods_per_year(time, default=252):
+    """
+    Bars per year implied by int64 epoch-nanosecond timestamps.
+
+    Counts bars per elapsed year rather than dividing a year by the bar
+    spacing, so closed sessions and weekends are accounted for: weekday
+    daily bars give about 261 and weekday hourly bars about 6264. Returns
+    `default` when there are no timestamps or they span no time.
+    """
+    if time is None or len(time) < 2:
+        return default
+    span = int(time[-1]) - int(time[0])
+    return (len(time) - 1) * YEAR_NS / span if span > 0 else default
+
+
+def evaluate_positions(prices, positions, cost_bps=0.0, slippage_bps=0.0, periods_per_year=252):
+    """
+    Backtest one or more position columns against a single price series.
+
+    Parameters:
+    - prices: Close prices, shape (n,).
+    - positions: Positions of shape (n,) or (n, k), as an array, Series or
+      DataFrame. 1 is long, -1 short, 0 flat; fractional sizes are allowed.
+      NaN is treated as flat.
+    - cost_bps: Commission per unit of turnover, in basis points.
+    - slippage_bps: Slippage per unit of turnover, in basis points.
+    - periods_per_year: Bars per year, for annualised figures.
+
+    Returns:
+    - stats: DataFrame with one row per position column: total_return,
+      annual_return, annual_volatility, sharpe, max_drawdown, exposure,
+      turnover, costs, n_trades, win_rate, avg_trade_return, avg_bars_held.
+      With no bars every statistic is NaN and n_trades is 0.
+    - equity: DataFrame of net equity curves, one column per position column,
+      starting at 1.0.
+    """
+    prices = np.asarray(prices, dtype=float)
+    pos, names = _as_matrix(positions)
+    if pos.shape[0] != len(prices):
+        raise ValueError("positions and prices must have the same number of bars")
+    # Work on (k, n) so every position column is contiguous along time
+    pos = np.ascontiguousarray(np.nan_to_num(pos).T)
+    k, n = pos.shape
+    if n == 0 or k == 0:
+        stats = pd.DataFrame(np.nan, index=pd.Index(names, name="positions"), columns=list(STATS_COLUMNS))
+        stats["n_trades"] = 0
+        return stats, pd.DataFrame(np.ones((n, k)), columns=names)
+
+    # Bar t's net return comes from the position held since bar t-1
+    asset_ret = np.zeros(n)
+    asset_ret[1:] = prices[1:] / prices[:-1] - 1
+    gross = np.zeros((k, n))
+    np.multiply(pos[:, :-1], asset_ret[1:], out=gross[:, 1:])
+
+    turnover = np.abs(np.diff(pos, axis=1, prepend=0.0))
+    costs = turnover * ((cost_bps + slippage_bps) / 1e4)
+    net = gross - costs
+
+    equity = np.cumprod(1 + net, axis=1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+
+    periods = max(n - 1, 1)
+    total_return = equity[:, -1] - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annual_return = np.where(equity[:, -1] > 0, equity[:, -1] ** (periods_per_year / periods) - 1, -1.0)
+        volatility = net[:, 1:].std(axis=1, ddof=1) * np.sqrt(periods_per_year) if n > 2 else np.zeros(k)
+        sharpe = np.where(volatility > 0, net[:, 1:].mean(axis=1) * periods_per_year / volatility, np.nan)
+
+    trades = _trade_stats(pos, np.log1p(gross), costs)
+
+    stats = pd.DataFrame({
+        "total_return": total_return,
+        "annual_return": annual_return,
+        "annual_volatility": volatility,
+        "sharpe": sharpe,
+        "max_drawdown": drawdown.min(axis=1),
+        "exposure": (pos != 0).mean(axis=1),
+        "turnover": turnover.sum(axis=1),
+        "costs": costs.sum(axis=1),
+        **trades,
+    }, index=pd.Index(names, name="positions"))
+    return stats, pd.DataFrame(equity.T, columns=names)
+
+
+def _trade_stats(pos, log_gross, costs):
+    """
+    Per-column trade statistics from run segmentation of (k, n) positions.
+
+    A trade is a run of bars holding the same non-zero position. It earns the
+    gross returns of the bars after each bar it is held, less the costs of
+    entering it and of leaving it.
+    """
+    k, n = pos.shape
+    if n == 0:
+        return {"n_trades": np.zeros(k, dtype=int), "win_rate": np.full(k, np.nan),
+                "avg_trade_return": np.full(k, np.nan), "avg_bars_held": np.full(k, np.nan)}
+
+    # Flatten column by column and force a new segment at each column start
+    flat = pos.ravel()
+    starts = np.ones(n * k, dtype=bool)
+    starts[1:] = flat[1:] != flat[:-1]
+    starts[::n] = True
+    segment = np.cumsum(starts) - 1
+    n_segments = segment[-1] + 1
+
+    seg_start = np.flatnonzero(starts)
+    seg_column = seg_start // n
+    seg_position = flat[seg_start]
+    seg_bars = np.bincount(segment, minlength=n_segments)
+
+    # Returns earned by the position held at bar t land on bar t+1
+    earned = np.zeros((k, n))
+    earned[:, :-1] = log_gross[:, 1:]
+    seg_log_return = np.bincount(segment, weights=earned.ravel(), minlength=n_segments)
+
+    # Entry cost sits on the segment's first bar, exit cost on the next segment's first bar
+    flat_costs = costs.ravel()
+    entry_cost = flat_costs[seg_start]
+    seg_end = np.append(seg_start[1:], n * k)
+    exits_inside_column = (seg_end % n != 0) & (seg_end < n * k)
+    exit_cost = np.where(exits_inside_column, flat_costs[np.minimum(seg_end, n * k - 1)], 0.0)
+
+    # Flipping long to short pays one combined cost; split it between the two trades
+    flip_next = np.zeros(n_segments, dtype=bool)
+    flip_next[:-1] = exits_inside_column[:-1] & (seg_position[1:] != 0)
+    exit_cost = np.where(flip_next & (seg_position != 0), exit_cost / 2, exit_cost)
+    flip_prev = np.zeros(n_segments, dtype=bool)
+    flip_prev[1:] = flip_next[:-1] & (seg_position[:-1] != 0)
+    entry_cost = np.where(flip_prev, entry_cost / 2, entry_cost)
+
+    trade_return = np.expm1(seg_log_return) - entry_cost - exit_cost
+    is_trade = seg_position != 0
+
+    column = seg_column[is_trade]
+    n_trades = np.bincount(column, minlength=k)
+    wins = np.bincount(column, weights=trade_return[is_trade] > 0, minlength=k)
+    sum_return = np.bincount(column, weights=trade_return[is_trade], minlength=k)
+    sum_bars = np.bincount(column, weights=seg_bars[is_trade], minlength=k)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "n_trades": n_trades,
+            "win_rate": wins / n_trades,
+            "avg_trade_return": sum_return / n_trades,
+            "avg_bars_held": sum_bars / n_trades,
+        }
@@ -0,0 +1,199 @@
+"""Compact array-backed OHLC bar storage.
+
+A BarStore keeps the price fields of an instrument as rows of one 2-D typed
+array (float64 or float32), plus int64 epoch-nanosecond timestamps. Each field
+is a contiguous NumPy view that kernels can read without copying, and slicing a
+store slices the views, so a window of history costs no memory. Field names are
+normalised once on the way in ('mid_close', 'Close' and 'close' are all
+'close'). DataFrames are only built at the edges, by from_dataframe() and
+to_dataframe().
+
+    store = BarStore.from_dataframe(pd.read_csv("backtest_prices.csv"), dtype=np.float32)
+    recent = store[-500:]                       # views, no copy
+    detect_change_points(recent.close, "Binseg")
+    parabolic_sar(recent.to_dataframe(style="title").reset_index(drop=True))
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+FIELDS = PRICE_FIELDS + ("volume",)
+
+# Timestamp columns in order of preference, with the format each is written in
+TIME_COLUMNS = {
+    "snapshottime": "%Y:%m:%d-%H:%M:%S",
+    "gmt time": "%d.%m.%Y %H:%M:%S.%f",
+    "date": None,
+    "datetime": None,
+    "timestamp": None,
+    "time": None,
+}
+
+
+def normalise_columns(df):
+    """
+    Rename price columns to the canonical lower-case names and parse the timestamp.
+
+    'mid_' prefixes are stripped and names are lower-cased. The first
+    recognised timestamp column is parsed and renamed to 'time'.
+
+    Returns:
+    - A new DataFrame; the input is not modified.
+    """
+    df = df.rename(columns={c: c.replace("mid_", "").strip().lower() for c in df.columns})
+    for col, fmt in TIME_COLUMNS.items():
+        if col in df.columns:
+            time = pd.to_datetime(df[col], format=fmt)
+            df = df.drop(columns=col)
+            df["time"] = time
+            break
+    return df
+
+
+def _to_epoch_ns(values):
+    """Convert datetimes to int64 nanoseconds since the epoch, in UTC."""
+    index = pd.DatetimeIndex(values)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return np.ascontiguousarray(index.as_unit("ns").asi8, dtype=np.int64)
+
+
+class BarStore:
+    """
+    OHLC(V) bars for one instrument held in contiguous typed arrays.
+
+    Every field is optional, so a close-only or high/low/close file loads as
+    is; reading a field the store does not hold raises AttributeError.
+
+    Parameters:
+    - time: int64 epoch nanoseconds, datetimes, or None when bars carry no timestamp.
+    - open, high, low, close, volume: Arrays of equal length, at least one of them.
+    - dtype: Price dtype, np.float64 or np.float32.
+    """
+
+    __slots__ = ("time", "_prices", "_fields")
+
+    def __init__(self, time, open=None, high=None, low=None, close=None, volume=None, dtype=np.float64):  # noqa: A002
+        given = dict(zip(FIELDS, (open, high, low, close, volume)))
+        self._fields = tuple(f for f in FIELDS if given[f] is not None)
+        if not self._fields:
+            raise ValueError("A BarStore needs at least one bar field")
+        columns = [given[f] for f in self._fields]
+        n = len(columns[0])
+        if any(len(col) != n for col in columns):
+            raise ValueError("All bar fields must have the same length")
+
+        self._prices = np.empty((len(columns), n), dtype=dtype)
+        for row, col in zip(self._prices, columns):
+            row[:] = col
+
+        if time is None:
+            self.time = None
+        else:
+            time = np.asarray(time)
+            self.time = time.astype(np.int64, copy=False) if time.dtype.kind in "iu" else _to_epoch_ns(time)
+            if len(self.time) != n:
+                raise ValueError("time must have the same length as the price fields")
+
+    @classmethod
+    def _from_parts(cls, time, prices, fields):
+        store = cls.__new__(cls)
+        store.time = time
+        store._prices = prices
+        store._fields = fields
+        return store
+
+    @classmethod
+    def from_dataframe(cls, df, dtype=np.float64):
+        """
+        Build a store from a DataFrame with any of the supported column spellings.
+
+        Whichever of open/high/low/close/volume are present are kept. The
+        timestamp comes from a recognised time column, or from the index when
+        it is a DatetimeIndex.
+        """
+        df = normalise_columns(df)
+        if not any(f in df.columns for f in FIELDS):
+            raise KeyError(f"No bar columns found, expected any of: {', '.join(FIELDS)}")
+
+        if "time" in df.columns:
+            time = df["time"]
+        elif isinstance(df.index, pd.DatetimeIndex):
+            time = df.index
+        else:
+            time = None
+
+        return cls(time, dtype=dtype, **{f: df[f].to_numpy() for f in FIELDS if f in df.columns})
+
+    def to_dataframe(self, style="lower", index="time"):
+        """
+        Build a DataFrame from the store.
+
+        Parameters:
+        - style: 'lower' for open/high/low/close, 'title' for Open/High/Low/Close,
+          'mid' for mid_open/mid_high/mid_low/mid_close.
+        - index: 'time' for a DatetimeIndex, 'range' for a RangeIndex with a 'time' column.
+        """
+        rename = {
+            "lower": lambda f: f,
+            "title": str.capitalize,
+            "mid": lambda f: f"mid_{f}" if f in PRICE_FIELDS else f,
+        }[style]
+        df = pd.DataFrame({rename(f): row for f, row in zip(self._fields, self._prices)})
+        if self.time is not None:
+            times = pd.DatetimeIndex(self.time.view("M8[ns]"))
+            if index == "time":
+                df.index = times
+            else:
+                df.insert(0, "time", times)
+        return df
+
+    def __len__(self):
+        return self._prices.shape[1]
+
+    def __getitem__(self, key):
+        """Slice bars. Basic slices return views; index arrays and masks copy."""
+        if isinstance(key, (int, np.integer)):
+            key = slice(key, key + 1 or None)
+        time = self.time[key] if self.time is not None else None
+        return self._from_parts(time, self._prices[:, key], self._fields)
+
+    def __getattr__(self, name):
+        # Only called when normal lookup fails, i.e. for field names
+        fields = object.__getattribute__(self, "_fields")
+        if name in fields:
+            return self._prices[fields.index(name)]
+        if name in FIELDS:
+            raise AttributeError(f"BarStore has no {name!r} field, only {', '.join(fields)}")
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    @property
+    def fields(self):
+        return self._fields
+
+    @property
+    def dtype(self):
+        return self._prices.dtype
+
+    @property
+    def datetimes(self):
+        """Timestamps as a DatetimeIndex viewing the int64 array."""
+        return None if self.time is None else pd.DatetimeIndex(self.time.view("M8[ns]"))
+
+    @property
+    def nbytes(self):
+        return self._prices.nbytes + (self.time.nbytes if self.time is not None else 0)
+
+    def astype(self, dtype):
+        """Copy of the store with prices in `dtype`."""
+        return self._from_parts(self.time, self._prices.astype(dtype), self._fields)
+
+    def __repr__(self):
+        span = ""
+        if self.time is not None and len(self):
+            span = f", {self.datetimes[0]} .. {self.datetimes[-1]}"
+        return f"BarStore({len(self)} bars, {', '.join(self._fields)}, {self.dtype}{span})"
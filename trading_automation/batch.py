@@ -0,0 +1,366 @@
+"""Headless batch runner for the indicators in this package.
+
+Usage:
+    python -m trading_automation.batch INPUT_DIR OUTPUT_DIR --analyses sar,sutte,sr --workers 8
+
+Every OHLC file in INPUT_DIR is loaded once in a worker process and each
+requested analysis is written to OUTPUT_DIR/<file>/<analysis>.csv. Finished
+(file, analysis) pairs are appended to OUTPUT_DIR/manifest.jsonl as soon as
+they complete, with the input's size and modification time, so a rerun after
+a crash skips them and only does what is left. A file that has changed since
+its pairs were recorded, e.g. one that gained new bars, is queued again.
+If a worker process dies, the analyses it finished are already in the
+manifest, the files it was working on are recorded as errors for the rest,
+and files it had not started are run in a fresh pool.
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201, C0415, W0718
+# C0415: Import outside toplevel, heavy libraries are imported on first use
+# W0718: Catching too general exception, a failing analysis must not stop the batch
+
+import argparse
+import json
+import logging
+import os
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import Manager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .barstore import BarStore
+from .instrumentation import emit, stage
+
+logger = logging.getLogger(__name__)
+
+CHANGE_POINT_METHODS = ("Binseg", "Window", "Dynp")
+MANIFEST = "manifest.jsonl"
+
+
+def load_ohlc(path, dtype=np.float64):
+    """
+    Read a price file into a BarStore.
+
+    Parameters:
+    - path: CSV or parquet file with any supported column spelling.
+    - dtype: Price dtype, np.float64 or np.float32.
+
+    Returns:
+    - BarStore with normalised field names.
+    """
+    path = Path(path)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    return BarStore.from_dataframe(df, dtype=dtype)
+
+
+def _frame(store, fields, rename=None):
+    """DataFrame of just `fields`, built at the edge for functions that need one."""
+    rename = rename or {}
+    return pd.DataFrame({rename.get(f, f): getattr(store, f) for f in fields})
+
+
+def run_sar(store):
+    from .cache import cached_parabolic_sar
+    from .psar import signal_generation
+
+    frame = _frame(store, ["high", "low", "close"], rename={"high": "High", "low": "Low", "close": "Close"})
+    out = signal_generation(frame, cached_parabolic_sar)
+    return out[["trend", "sar", "real_sar", "ep", "af", "positions", "signals"]]
+
+
+def run_sutte(store):
+    from .cache import cached_calculate_sutte
+
+    out = cached_calculate_sutte(_frame(store, ["close", "high", "low"]))
+    return out[["sutte%l", "sutte%h", "sutte-pred"]]
+
+
+def run_support_resistance(store):
+    from .cache import cached_get_sure_OHLC
+
+    _, su, re = cached_get_sure_OHLC(_frame(store, ["high", "low"]), intervals=[])
+    return pd.DataFrame({
+        "kind": ["support"] * len(su) + ["resistance"] * len(re),
+        "level": np.concatenate([su, re]),
+    })
+
+
+def run_change_points(store):
+    from .cache import cached_detect_change_points as detect_change_points
+    from .structural_break import score_method
+
+    points = store.close
+    rows = []
+    for method in CHANGE_POINT_METHODS:
+        bkps = detect_change_points(points, method)
+        score = score_method(points, bkps)
+        rows.extend((method, bkp, score) for bkp in bkps)
+    return pd.DataFrame(rows, columns=["method", "breakpoint", "score"])
+
+
+def run_angles(store):
+    from .angle_variation import calculate_angles
+
+    out = calculate_angles(_frame(store, ["close"]))
+    return out[["delta_y", "angles"]]
+
+
+def run_moving_averages(store):
+    from .cache import cached_calculate_moving_averages
+
+    out = cached_calculate_moving_averages(_frame(store, ["close"], rename={"close": "Close"}))
+    return out.drop(columns="Close")
+
+
+def run_backtest(store):
+    from .backtest import evaluate_positions, infer_periods_per_year
+
+    positions = run_sar(store)[["positions"]].rename(columns={"positions": "sar"})
+    # Inputs are daily, hourly or minute bars, so annualise from their own spacing
+    stats, _ = evaluate_positions(store.close, positions, periods_per_year=infer_periods_per_year(store.time))
+    return stats
+
+
+ANALYSES = {
+    "sar": run_sar,
+    "sutte": run_sutte,
+    "sr": run_support_resistance,
+    "changepoints": run_change_points,
+    "angles": run_angles,
+    "ma": run_moving_averages,
+    "backtest": run_backtest,
+}
+
+
+def _write_atomic(df, target):
+    """Write to a temporary file first so a crash never leaves a partial result."""
+    tmp = target.with_name(target.name + ".tmp")
+    df.to_csv(tmp, index=True)
+    os.replace(tmp, target)
+
+
+def _source_stamp(path):
+    st = Path(path).stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def process_file(path, analyses, output_dir, dtype=np.float64, progress=None):
+    """
+    Load one price file and run the requested analyses on it.
+
+    Returns a list of manifest records, one per analysis. A failing analysis
+    is recorded with status 'error' and does not stop the others. When a
+    `progress` queue is given, ("start", file, None) is put on it before the
+    file is loaded and ("record", file, record) as each analysis finishes, so
+    finished work survives the worker dying part way through the file.
+    """
+    path = Path(path)
+    target_dir = Path(output_dir) / path.stem
+    target_dir.mkdir(parents=True, exist_ok=True)
+    # Taken before reading, so a file modified during the run is picked up next time
+    source = _source_stamp(path)
+    if progress is not None:
+        progress.put(("start", path.name, None))
+
+    try:
+        with stage("load") as s:
+            store = load_ohlc(path, dtype=dtype)
+            s.rows = len(store)
+    except Exception as ex:
+        records = [{"file": path.name, "analysis": name, **source, "status": "error", "error": f"load: {ex}"}
+                   for name in analyses]
+        for record in records if progress is not None else []:
+            progress.put(("record", path.name, record))
+        return records
+
+    records = []
+    for name in analyses:
+        start = time.perf_counter()
+        record = {"file": path.name, "analysis": name, **source}
+        try:
+            with stage(f"compute:{name}", rows=len(store)):
+                result = ANALYSES[name](store)
+            with stage(f"write:{name}", rows=len(result)):
+                _write_atomic(result, target_dir / f"{name}.csv")
+            record.update(status="ok", rows=len(result))
+        except Exception as ex:
+            record.update(status="error", error=f"{type(ex).__name__}: {ex}")
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        records.append(record)
+        if progress is not None:
+            progress.put(("record", path.name, record))
+
+    emit("batch", file=path.name)
+    return records
+
+
+def read_manifest(output_dir):
+    """
+    Return the (file, analysis) pairs that already finished successfully.
+
+    Returns:
+    - Dict mapping (file, analysis) to the {"size", "mtime_ns"} stamp of the
+      input they were computed from, or None for records written before
+      stamps were kept.
+    """
+    manifest = Path(output_dir) / MANIFEST
+    done = {}
+    if not manifest.exists():
+        return done
+    with manifest.open() as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line from an interrupted run
+            if record.get("status") == "ok":
+                stamp = {k: record[k] for k in ("size", "mtime_ns")} if "mtime_ns" in record else None
+                done[(record["file"], record["analysis"])] = stamp
+    return done
+
+
+def run_batch(input_dir, output_dir, analyses, pattern="*.csv", workers=None, resume=True, dtype=np.float64):
+    """
+    Run `analyses` over every file in `input_dir` matching `pattern`.
+
+    Parameters:
+    - input_dir: Directory of OHLC price files.
+    - output_dir: Directory for results and the manifest.
+    - analyses: Names from ANALYSES.
+    - pattern: Glob used to select input files.
+    - workers: Process pool size, defaults to os.cpu_count().
+    - resume: Skip (file, analysis) pairs already recorded as done for the
+      current size and modification time of the file.
+    - dtype: Price dtype used to hold each file, np.float64 or np.float32.
+
+    Returns:
+    - List of manifest records written in this run.
+    """
+    unknown = set(analyses) - set(ANALYSES)
+    if unknown:
+        raise ValueError(f"Unknown analyses: {', '.join(sorted(unknown))}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    done = read_manifest(output_dir) if resume else {}
+
+    tasks = []
+    skipped = 0
+    for path in sorted(Path(input_dir).glob(pattern)):
+        stamp = _source_stamp(path)
+        pending = [name for name in analyses if (path.name, name) not in done or done[(path.name, name)] != stamp]
+        changed = [name for name in pending if (path.name, name) in done]
+        if changed:
+            logger.warning(f"{path.name} changed since it was last processed, rerunning {', '.join(changed)}")
+        skipped += len(analyses) - len(pending)
+        if pending:
+            tasks.append((path, pending))
+
+    total = sum(len(pending) for _, pending in tasks)
+    logger.info(f"{len(tasks)} files, {total} analyses to run ({skipped} already done)")
+
+    manifest_path = output_dir / MANIFEST
+    if manifest_path.exists() and manifest_path.stat().st_size:
+        with manifest_path.open("rb") as fh:
+            fh.seek(-1, os.SEEK_END)
+            torn = fh.read(1) != b"\n"
+        if torn:
+            with manifest_path.open("a") as fh:
+                fh.write("\n")
+
+    records = []
+
+    def write(manifest, record):
+        manifest.write(json.dumps(record) + "\n")
+        manifest.flush()
+        os.fsync(manifest.fileno())
+        records.append(record)
+        logger.info(f"[{len(records)}/{total}] {record['file']} {record['analysis']}: {record['status']}")
+
+    with Manager() as manager, manifest_path.open("a") as manifest:
+        progress = manager.Queue()
+        while tasks:
+            started, recorded = set(), set()
+
+            def drain():
+                while True:
+                    try:
+                        kind, name, record = progress.get_nowait()
+                    except queue.Empty:
+                        return
+                    if kind == "start":
+                        started.add(name)
+                    else:
+                        recorded.add((name, record["analysis"]))
+                        write(manifest, record)
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(process_file, path, pending, output_dir, dtype, progress): (path, pending)
+                           for path, pending in tasks}
+                running = set(futures)
+                while running:
+                    _, running = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+                    drain()
+            drain()
+
+            # A worker that dies (e.g. killed for memory) breaks the pool and fails every
+            # outstanding future. Files it never started go to a fresh pool; files that
+            # were in progress are recorded as errors for the analyses they did not finish.
+            retry = []
+            for future, (path, pending) in futures.items():
+                ex = future.exception()
+                unfinished = [name for name in pending if (path.name, name) not in recorded]
+                if ex is None or not unfinished:
+                    continue
+                if isinstance(ex, BrokenProcessPool) and path.name not in started:
+                    retry.append((path, unfinished))
+                    continue
+                for name in unfinished:
+                    write(manifest, {"file": path.name, "analysis": name, "status": "error",
+                                     "error": f"worker failed: {type(ex).__name__}: {ex}"})
+            if len(retry) == len(tasks):
+                for path, unfinished in retry:
+                    for name in unfinished:
+                        write(manifest, {"file": path.name, "analysis": name, "status": "error",
+                                         "error": "worker failed: process pool broke before the file started"})
+                retry = []
+            elif retry:
+                logger.warning(f"Worker process died, resubmitting {len(retry)} files it had not started")
+            tasks = retry
+
+    failed = sum(record["status"] != "ok" for record in records)
+    logger.info(f"Finished {len(records)} analyses, {failed} failed")
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run indicators over a directory of OHLC price files.")
+    parser.add_argument("input_dir", help="Directory of OHLC price files")
+    parser.add_argument("output_dir", help="Directory for results and manifest.jsonl")
+    parser.add_argument("--analyses", default=",".join(ANALYSES),
+                        help=f"Comma separated subset of: {', '.join(ANALYSES)}")
+    parser.add_argument("--pattern", default="*.csv", help="Glob selecting input files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--cache", metavar="DIR", help="Reuse indicator results cached in DIR across runs")
+    parser.add_argument("--float32", action="store_true", help="Hold prices as float32 to halve memory")
+    parser.add_argument("--no-resume", action="store_true", help="Rerun analyses already in the manifest")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.cache:
+        # Workers read the cache location from the environment they inherit
+        os.environ["TRADING_CACHE_DIR"] = args.cache
+    analyses = [name.strip() for name in args.analyses.split(",") if name.strip()]
+    records = run_batch(args.input_dir, args.output_dir, analyses, pattern=args.pattern,
+                        workers=args.workers, resume=not args.no_resume,
+                        dtype=np.float32 if args.float32 else np.float64)
+    return 1 if any(record["status"] != "ok" for record in records) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,322 @@
+"""Persistent content-addressed cache for indicator results.
+
+Results are keyed by the function name, its parameters and a hash of the
+input data, and are pickled to disk under the cache directory. The least
+recently used entries are deleted once the directory grows past its size
+limit.
+
+For append-only history, a lookup that misses exactly can still find a cached
+result whose input was a prefix of the new input. Functions that can continue
+from an earlier result register an `extend` callable, so only the new tail is
+computed.
+
+Caching is opt-in. Set TRADING_CACHE_DIR, or call set_default_cache(). Until
+then the cached_* wrappers below call straight through to the functions they
+wrap.
+
+    cache = ResultCache("~/.cache/trading_automation", max_bytes=2 << 30)
+    set_default_cache(cache)
+    sar = cached_parabolic_sar(bars)     # computed, stored
+    sar = cached_parabolic_sar(bars)     # loaded from disk
+    sar = cached_parabolic_sar(longer)   # cached prefix extended by the new bars
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201, W0603
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .barstore import BarStore
+from .compare_ma import calculate_moving_averages
+from .psar import SAR_COLUMNS, extend_parabolic_sar, parabolic_sar
+from .structural_break import detect_change_points
+from .support_resistance_analysis import get_sure_OHLC
+from .sutte_indicator_example import calculate_sutte
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 1 << 30
+ENTRY_SUFFIX = ".pkl"
+
+
+def _array_bytes(values):
+    values = np.asarray(values)
+    if values.dtype == object:
+        # Object arrays hold pointers, so hash their values instead
+        values = pd.util.hash_array(values)
+    elif values.dtype.kind in "mM":
+        values = values.view(np.int64)
+    return memoryview(np.ascontiguousarray(values)).cast("B")
+
+
+def _index_buffers(index, rows):
+    # Results carry the caller's index, so two inputs differing only in index must not share an entry
+    yield repr((type(index).__name__, str(index.dtype), index.names)).encode()
+    if isinstance(index, pd.RangeIndex):
+        yield repr((index.start, index.step)).encode()
+    else:
+        yield _array_bytes(index[:rows].to_numpy())
+
+
+def _buffers(data, rows):
+    """Yield the byte buffers that identify the first `rows` rows of `data`."""
+    if isinstance(data, pd.DataFrame):
+        yield repr([(str(c), str(t)) for c, t in data.dtypes.items()]).encode()
+        yield from _index_buffers(data.index, rows)
+        for col in data.columns:
+            yield _array_bytes(data[col].to_numpy()[:rows])
+    elif isinstance(data, pd.Series):
+        yield repr((str(data.name), str(data.dtype))).encode()
+        yield from _index_buffers(data.index, rows)
+        yield _array_bytes(data.to_numpy()[:rows])
+    elif isinstance(data, BarStore):
+        yield repr((data.fields, str(data.dtype))).encode()
+        if data.time is not None:
+            yield _array_bytes(data.time[:rows])
+        for field in data.fields:
+            yield _array_bytes(getattr(data, field)[:rows])
+    else:
+        data = np.asarray(data)
+        yield repr((str(data.dtype), data.shape[1:])).encode()
+        yield _array_bytes(data[:rows])
+
+
+def fingerprint(data, rows=None):
+    """
+    Content hash of the first `rows` rows of an array, Series, DataFrame or BarStore.
+
+    Column names, dtypes and the index of a Series or DataFrame are part of the hash.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for buf in _buffers(data, rows):
+        h.update(buf)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk result store with least-recently-used eviction by total size.
+
+    Parameters:
+    - directory: Cache directory, created if missing.
+    - max_bytes: Size the directory is trimmed back to after each write.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._size = sum(p.stat().st_size for p in self._entries())
+
+    def _entries(self):
+        return self.directory.glob(f"*/*{ENTRY_SUFFIX}")
+
+    def call_key(self, name, params):
+        """Hash of a function name and its JSON-encoded parameters."""
+        blob = json.dumps([name, params], sort_keys=True, default=repr)
+        return hashlib.blake2b(blob.encode(), digest_size=16).hexdigest()
+
+    def _path(self, call_key, rows, digest):
+        # Row count in the name lets prefix lookups skip reading the entries
+        return self.directory / call_key / f"{rows:012d}-{digest}{ENTRY_SUFFIX}"
+
+    def _load(self, path):
+        try:
+            with path.open("rb") as fh:
+                result = pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        os.utime(path)  # Mark as recently used
+        return result
+
+    def get(self, call_key, data, digest=None):
+        """Cached result for exactly this input, or None."""
+        digest = digest or fingerprint(data)
+        path = self._path(call_key, len(data), digest)
+        return self._load(path) if path.exists() else None
+
+    def get_prefix(self, call_key, data):
+        """
+        Longest cached result whose input is a strict prefix of `data`.
+
+        Returns:
+        - (rows, result) for the cached prefix length, or None.
+        """
+        folder = self.directory / call_key
+        if not folder.is_dir():
+            return None
+        candidates = []
+        for path in folder.glob(f"*{ENTRY_SUFFIX}"):
+            rows, _, digest = path.stem.partition("-")
+            if int(rows) < len(data):
+                candidates.append((int(rows), digest, path))
+        for rows, digest, path in sorted(candidates, reverse=True):
+            if fingerprint(data, rows) == digest:
+                result = self._load(path)
+                if result is not None:
+                    return rows, result
+        return None
+
+    def put(self, call_key, data, result, digest=None):
+        """Store `result` for `data` and evict old entries if over the size limit."""
+        digest = digest or fingerprint(data)
+        path = self._path(call_key, len(data), digest)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._size += path.stat().st_size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by another process
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+    def clear(self):
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    @property
+    def size(self):
+        return self._size
+
+
+_default_cache = None
+
+
+def set_default_cache(cache):
+    """Use `cache` for memoized functions called without an explicit cache. None disables caching."""
+    global _default_cache
+    _default_cache = cache
+
+
+def default_cache():
+    """The configured default cache, created from TRADING_CACHE_DIR on first use."""
+    global _default_cache
+    if _default_cache is None and os.environ.get("TRADING_CACHE_DIR"):
+        max_bytes = int(os.environ.get("TRADING_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        _default_cache = ResultCache(os.environ["TRADING_CACHE_DIR"], max_bytes=max_bytes)
+    return _default_cache
+
+
+def _copy(data):
+    return data.copy() if isinstance(data, (pd.DataFrame, pd.Series, np.ndarray)) else data
+
+
+def memoize(func=None, *, cache=None, extend=None, name=None, version="1"):
+    """
+    Cache `func(data, *params)` results on disk.
+
+    The first argument is the data that is hashed; the remaining arguments
+    are the parameters and must be JSON-encodable or have a stable repr.
+
+    Several wrapped functions add their columns to the DataFrame they are
+    given. The wrapper always passes them a copy, whether the result is
+    computed, loaded or extended, so the caller's data is never modified
+    and the return value is the only output.
+
+    Parameters:
+    - cache: ResultCache to use, defaults to default_cache(). With no cache
+      configured the wrapper calls `func` directly.
+    - extend: Optional `extend(cached_result, data, rows, **params)` that
+      continues a result computed on the first `rows` rows of `data`. It may
+      return None to fall back to a full computation.
+    - name: Key prefix, defaults to the function's module and qualified name.
+    - version: Bump to invalidate entries after changing the function.
+    """
+    if func is None:
+        return functools.partial(memoize, cache=cache, extend=extend, name=name, version=version)
+
+    signature = inspect.signature(func)
+    key_name = f"{name or f'{func.__module__}.{func.__qualname__}'}@{version}"
+
+    @functools.wraps(func)
+    def wrapper(data, *args, **kwargs):
+        store = cache or default_cache()
+        if store is None:
+            return func(_copy(data), *args, **kwargs)
+
+        bound = signature.bind(data, *args, **kwargs)
+        bound.apply_defaults()
+        params = dict(list(bound.arguments.items())[1:])
+        call_key = store.call_key(key_name, params)
+        digest = fingerprint(data)
+
+        result = store.get(call_key, data, digest)
+        if result is not None:
+            return result
+
+        if extend is not None:
+            prefix = store.get_prefix(call_key, data)
+            if prefix is not None:
+                rows, cached = prefix
+                result = extend(cached, data, rows, **params)
+                if result is not None:
+                    logger.debug(f"{key_name}: extended cached {rows} rows to {len(data)}")
+
+        if result is None:
+            result = func(_copy(data), *args, **kwargs)
+        store.put(call_key, data, result, digest)
+        return result
+
+    wrapper.uncached = func
+    return wrapper
+
+
+def lookback_extender(func, lookback):
+    """
+    Build an `extend` for DataFrame indicators whose row i depends only on rows i-lookback..i.
+
+    The tail is recomputed from `lookback` rows before the cached length and
+    spliced onto the cached rows.
+    """
+    def extend(cached, data, rows, **params):
+        start = max(rows - lookback, 0)
+        tail = func(data.iloc[start:].copy(), **params)
+        return pd.concat([cached.iloc[:rows], tail.iloc[rows - start:]])
+    return extend
+
+
+def _extend_sar(cached, data, rows):
+    if rows < 2:
+        return None
+    frame = data.copy()
+    for column in SAR_COLUMNS:
+        values = np.zeros(len(frame))
+        values[:rows] = cached[column].to_numpy()[:rows]
+        frame[column] = values
+    return extend_parabolic_sar(frame, rows)
+
+
+cached_parabolic_sar = memoize(parabolic_sar, extend=_extend_sar)
+cached_calculate_sutte = memoize(calculate_sutte, extend=lookback_extender(calculate_sutte, 1))
+cached_get_sure_OHLC = memoize(get_sure_OHLC)
+cached_detect_change_points = memoize(detect_change_points)
+cached_calculate_moving_averages = memoize(calculate_moving_averages)
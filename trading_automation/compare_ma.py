@@ -1,7 +1,7 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import pandas_ta as ta
+
+from .instrumentation import emit, stage
 
 
 def generate_stock_data(days=100):
@@ -13,6 +13,8 @@ def generate_stock_data(days=100):
 
 def calculate_moving_averages(df):
     """Calculate various moving averages and add them to the DataFrame"""
+    import pandas_ta  # noqa: F401  registers the DataFrame.ta accessor
+
     # ma_types = ["dema", "ema", "fwma", "hma", "linreg", "midpoint", "pwma", "rma", 
     #             "sinwma", "sma", "swma", "t3", "tema", "trima", "vidya", "wma", "zlma"]
     
@@ -26,6 +28,8 @@ def calculate_moving_averages(df):
 
 def plot_moving_averages(df):
     """Plot the stock data and its moving averages"""
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(14, 7))
     plt.plot(df['Date'], df['Close'], label='Close Price', linewidth=2)
 
@@ -40,11 +44,21 @@ def plot_moving_averages(df):
     plt.legend()
     plt.show()
 
-# Generate stock data
-stock_data = generate_stock_data(days=200)
+def main():
+    # Generate stock data
+    with stage("load") as s:
+        stock_data = generate_stock_data(days=200)
+        s.rows = len(stock_data)
+
+    # Calculate moving averages
+    with stage("compute", rows=len(stock_data)):
+        stock_data = calculate_moving_averages(stock_data.set_index('Date'))
+
+    # Plot moving averages and stock data
+    with stage("plot", rows=len(stock_data)):
+        plot_moving_averages(stock_data.reset_index())
 
-# Calculate moving averages
-stock_data = calculate_moving_averages(stock_data.set_index('Date'))
+    emit("compare_ma")
 
-# Plot moving averages and stock data
-plot_moving_averages(stock_data.reset_index())
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+
+# Disclaimer:
+# This script is provided for educational and informational purposes only. It demonstrates the usage of curve fitting techniques for modeling data. It is not intended as professional advice for scientific or engineering applications.
+
+# Brief Description:
+# The script performs curve fitting on noisy data using both the curve_fit function from scipy.optimize and the lmfit package. It generates noisy data, defines a model function, fits the model to the data using both methods, and then visualizes the results by plotting the original data alongside the fitted curves.
+
+#Author: James Sawyer
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import emit, stage
+
+PARAM_NAMES = ['amplitude', 'frequency', 'phase', 'offset']
+
+# Generate some noisy data
+def generate_noisy_sine(n=100, seed=0):
+    np.random.seed(seed)
+    x = np.linspace(0, 10, n)
+    y = 3 * np.sin(1.5 * x) + np.random.normal(scale=0.3, size=x.size)
+    return x, y
+
+# Define a model function
+def model_function(x, amplitude, frequency, phase, offset):
+    return amplitude * np.sin(frequency * x + phase) + offset
+
+# Analytic Jacobian of model_function with respect to its parameters
+def model_jacobian(x, amplitude, frequency, phase, offset):
+    arg = frequency * x + phase
+    cos_arg = np.cos(arg)
+    return np.column_stack((np.sin(arg), amplitude * x * cos_arg, amplitude * cos_arg, np.ones_like(x)))
+
+def _fit_windows(x, y, starts, window, p0, maxfev):
+    """
+    Fit consecutive windows in order, seeding each fit with the previous
+    window's parameters. A window that fails to converge keeps the last good
+    parameters as the seed for the next one.
+    """
+    from scipy.optimize import curve_fit
+
+    rows = []
+    p = np.asarray(p0, dtype=float)
+    for start in starts:
+        xw = x[start:start + window]
+        yw = y[start:start + window]
+        try:
+            popt, _, info, _, ier = curve_fit(model_function, xw, yw, p0=p, jac=model_jacobian,
+                                              maxfev=maxfev, full_output=True)
+            converged = ier in (1, 2, 3, 4)
+            nfev, njev = info['nfev'], info.get('njev', 0)
+            p = popt
+        except RuntimeError:
+            popt = np.full(len(PARAM_NAMES), np.nan)
+            converged, nfev, njev = False, maxfev, 0
+        rows.append([start + window - 1, *popt, converged, nfev, njev])
+    return rows
+
+def rolling_sine_fit(x, y, window, step=1, p0=(2, 1, 0, 0), n_workers=None, maxfev=2000):
+    """
+    Fit `model_function` over a rolling window ending on every `step`-th bar.
+
+    The windows are split into contiguous blocks, one task per block, and the
+    blocks are spread across a process pool. Inside a block every fit is warm
+    started from the previous window; only the first window of each block
+    starts from `p0`. Use n_workers=1 to warm start the whole series in-process.
+
+    Parameters:
+    - x, y: 1-D arrays of sample positions and observations.
+    - window: Number of bars per fit.
+    - step: Distance between consecutive window starts.
+    - p0: Cold-start parameters (amplitude, frequency, phase, offset).
+    - n_workers: Pool size, defaults to os.cpu_count().
+    - maxfev: Maximum function evaluations per window.
+
+    Returns:
+    - DataFrame indexed by the last bar of each window with the fitted
+      parameters, a 'converged' flag and 'nfev'/'njev' evaluation counts.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    starts = np.arange(0, len(x) - window + 1, step)
+    n_workers = n_workers or os.cpu_count() or 1
+
+    if n_workers == 1 or len(starts) < 2:
+        rows = _fit_windows(x, y, starts, window, p0, maxfev)
+    else:
+        blocks = [b for b in np.array_split(starts, n_workers) if len(b)]
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_fit_windows, x, y, block, window, p0, maxfev) for block in blocks]
+            rows = [row for future in futures for row in future.result()]
+
+    columns = ['bar', *PARAM_NAMES, 'converged', 'nfev', 'njev']
+    return pd.DataFrame(rows, columns=columns).set_index('bar')
+
+def _batch_jacobian(x, params):
+    """Stacked Jacobians of model_function, shape (n_series, n_points, 4)."""
+    amplitude, frequency, phase, _ = (params[:, k, None] for k in range(4))
+    arg = frequency * x + phase
+    cos_arg = np.cos(arg)
+    return np.stack((np.sin(arg), amplitude * x * cos_arg, amplitude * cos_arg,
+                     np.ones_like(arg)), axis=-1)
+
+def _trust_region_damping(lam, c, delta, par, max_iter=10):
+    """
+    Damping that makes the scaled step length match the trust radius, as in MINPACK's lmpar.
+
+    With the scaled normal matrix written as V diag(lam) V^T and c = V^T g,
+    the scaled step for damping `par` has length sqrt(sum(c**2 / (lam + par)**2)).
+    The Gauss-Newton step (par = 0) is kept when it already fits inside
+    1.1 * delta; otherwise Newton iterations on 1/length find a damping whose
+    step length is within 10% of delta.
+    """
+    tiny = np.finfo(float).tiny
+    rank_deficient = lam[:, 0] <= np.finfo(float).eps * lam[:, -1]
+    safe_lam = np.where(lam > np.finfo(float).eps * lam[:, -1:], lam, np.inf)
+
+    def length(p):
+        return np.sqrt(np.sum(c**2 / (safe_lam + p[:, None])**2, axis=1))
+
+    def curvature(p):
+        return np.sum(c**2 / (safe_lam + p[:, None])**3, axis=1)
+
+    zero = np.zeros(len(lam))
+    gn_length = length(zero)
+    gauss_newton = ~rank_deficient & (gn_length <= 1.1 * delta)
+
+    # Bracket the root: the Newton step from zero is a lower bound when JtJ is
+    # non-singular, and the scaled gradient norm over delta is an upper bound
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lower = np.where(rank_deficient, 0.0, (gn_length - delta) / delta * gn_length**2 / curvature(zero))
+    lower = np.maximum(np.nan_to_num(lower), 0.0)
+    upper = np.sqrt(np.sum(c**2, axis=1)) / delta
+    upper = np.where(upper == 0, tiny / np.minimum(delta, 0.1), upper)
+
+    par = np.clip(par, lower, upper)
+    searching = ~gauss_newton
+    for _ in range(max_iter):
+        par = np.where(searching & (par == 0), np.maximum(tiny, 0.001 * upper), par)
+        step_length = length(par)
+        miss = step_length - delta
+        searching &= np.abs(miss) > 0.1 * delta
+        if not searching.any():
+            break
+        correction = miss / delta * step_length**2 / curvature(par)
+        lower = np.where(searching & (miss > 0), np.maximum(lower, par), lower)
+        upper = np.where(searching & (miss < 0), np.minimum(upper, par), upper)
+        par = np.where(searching, np.maximum(lower, par + correction), par)
+
+    return np.where(gauss_newton, 0.0, par)
+
+def batch_levenberg_marquardt(x, Y, p0=(2, 1, 0, 0), max_iter=500, ftol=1.49012e-8, xtol=1.49012e-8,
+                              lambda0=1e-3, factor=100.0):
+    """
+    Fit model_function to many series at once with Levenberg-Marquardt.
+
+    All parameter vectors advance together and follow the trust-region scheme
+    of MINPACK's lmder, which curve_fit uses: each series keeps a radius
+    bounding its step length in parameters scaled by the Jacobian column
+    norms, and the damping for every active series is chosen so its step fits
+    that radius. The radius grows after good steps and shrinks after poor
+    ones, so a series started far from the optimum cannot take the unbounded
+    steps that send plain damped Gauss-Newton into a degenerate valley. The
+    Jacobian is only rebuilt for series whose last step was accepted, and a
+    series drops out of the active set as soon as it converges.
+
+    Parameters:
+    - x: Sample positions, shape (n_points,) shared by all series or (n_series, n_points).
+    - Y: Observations, shape (n_series, n_points).
+    - p0: Starting parameters, shape (4,) or (n_series, 4).
+    - max_iter: Maximum number of trial steps per series.
+    - ftol: Relative reduction in the sum of squares, actual and predicted,
+      that counts as converged.
+    - xtol: Relative length of an accepted step that counts as converged.
+    - lambda0: Initial damping relative to the largest diagonal entry of the
+      scaled JtJ, the starting point of the search for each series' damping.
+    - factor: Initial trust radius as a multiple of the scaled norm of p0.
+
+    Returns:
+    - popt: Fitted parameters, shape (n_series, 4).
+    - converged: Boolean mask of series that met a tolerance.
+    - n_iter: Trial steps used per series.
+    - cost: Final sum of squared residuals per series.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    n_series = Y.shape[0]
+    x = np.broadcast_to(np.asarray(x, dtype=float), Y.shape)
+    params = np.array(np.broadcast_to(np.asarray(p0, dtype=float), (n_series, 4)))
+    eps = np.finfo(float).eps
+
+    def residuals(idx, p):
+        return Y[idx] - model_function(x[idx], *(p[:, k, None] for k in range(4)))
+
+    everything = np.arange(n_series)
+    cost = np.sum(residuals(everything, params)**2, axis=1)
+    converged = np.zeros(n_series, dtype=bool)
+    n_iter = np.zeros(n_series, dtype=int)
+
+    # Per-series state kept across rejected steps, which reuse the last Jacobian
+    scale = np.zeros((n_series, 4))
+    radius = np.zeros(n_series)
+    damping = np.zeros(n_series)
+    eigvals = np.zeros((n_series, 4))
+    eigvecs = np.zeros((n_series, 4, 4))
+    grad = np.zeros((n_series, 4))
+    first = np.ones(n_series, dtype=bool)
+    stale = np.ones(n_series, dtype=bool)
+    active = everything
+
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+
+        rebuild = active[stale[active]]
+        if rebuild.size:
+            p = params[rebuild]
+            J = _batch_jacobian(x[rebuild], p)
+            col_norms = np.sqrt(np.einsum('snk,snk->sk', J, J))
+            new = first[rebuild]
+            # Scale by the column norms, never shrinking after the first step
+            col_norms = np.where(col_norms == 0, 1.0, col_norms)
+            scale[rebuild] = np.where(new[:, None], col_norms, np.maximum(scale[rebuild], col_norms))
+            d = scale[rebuild]
+            JtJ = np.einsum('snk,snl->skl', J, J) / (d[:, :, None] * d[:, None, :])
+            Jtr = np.einsum('snk,sn->sk', J, residuals(rebuild, p)) / d
+            eigvals[rebuild], eigvecs[rebuild] = np.linalg.eigh(JtJ)
+            grad[rebuild] = Jtr
+
+            start = rebuild[new]
+            xnorm0 = np.linalg.norm(scale[start] * params[start], axis=1)
+            radius[start] = np.where(xnorm0 > 0, factor * xnorm0, factor)
+            damping[start] = lambda0 * np.diagonal(JtJ[new], axis1=1, axis2=2).max(axis=1)
+            stale[rebuild] = False
+
+        lam, V, d = eigvals[active], eigvecs[active], scale[active]
+        c = np.einsum('skl,sk->sl', V, grad[active])
+        par = _trust_region_damping(lam, c, radius[active], damping[active])
+
+        keep = lam > eps * lam[:, -1:]
+        coeff = np.where(keep | (par[:, None] > 0), c / (lam + par[:, None]), 0.0)
+        scaled_step = np.einsum('skl,sl->sk', V, coeff)
+        step_norm = np.linalg.norm(scaled_step, axis=1)
+        radius[active] = np.where(first[active], np.minimum(radius[active], step_norm), radius[active])
+        first[active] = False
+
+        p = params[active]
+        trial = p + scaled_step / d
+        trial_cost = np.sum(residuals(active, trial)**2, axis=1)
+        n_iter[active] += 1
+
+        # Actual and predicted relative reductions, as in lmder
+        base = cost[active]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            actual = np.where(trial_cost < 100 * base, 1 - trial_cost / base, -1.0)
+            model_term = np.sum(lam * coeff**2, axis=1) / base
+            damping_term = par * step_norm**2 / base
+            predicted = model_term + 2 * damping_term
+            directional = -(model_term + damping_term)
+            ratio = np.where(predicted > 0, actual / predicted, 0.0)
+
+        # Shrink the radius after a poor step and grow it after a good one
+        shrink = np.where(actual >= 0, 0.5, 0.5 * directional / (directional + 0.5 * actual))
+        shrink = np.where((trial_cost >= 100 * base) | (shrink < 0.1), 0.1, shrink)
+        poor = ratio <= 0.25
+        good = ~poor & ((par == 0) | (ratio >= 0.75))
+        new_radius = np.where(poor, shrink * np.minimum(radius[active], step_norm / 0.1),
+                              np.where(good, step_norm / 0.5, radius[active]))
+        damping[active] = np.where(poor, par / shrink, np.where(good, 0.5 * par, par))
+        radius[active] = new_radius
+
+        accepted = ratio >= 1e-4
+        upd = active[accepted]
+        params[upd] = trial[accepted]
+        cost[upd] = trial_cost[accepted]
+        stale[upd] = True
+
+        # A rejected step only shrinks the radius, it never counts as converging in x
+        xnorm = np.linalg.norm(d * params[active], axis=1)
+        small_reduction = (np.abs(actual) <= ftol) & (predicted <= ftol) & (ratio <= 2)
+        small_step = accepted & (step_norm <= xtol * xnorm)
+        done = small_reduction | small_step
+        stalled = new_radius <= eps * xnorm
+
+        converged[active[done]] = True
+        active = active[~(done | stalled)]
+
+    return params, converged, n_iter, cost
+
+def main():
+    from lmfit import Model
+    from scipy.optimize import curve_fit
+    import matplotlib.pyplot as plt
+
+    with stage("load") as s:
+        x, y = generate_noisy_sine()
+        s.rows = len(x)
+
+    # Using curve_fit
+    with stage("compute:curve_fit", rows=len(x)):
+        popt, pcov = curve_fit(model_function, x, y, p0=[2, 1, 0, 0])
+
+    # Using lmfit
+    with stage("compute:lmfit", rows=len(x)):
+        model = Model(model_function)
+        params = model.make_params(amplitude=2, frequency=1, phase=0, offset=0)
+        result = model.fit(y, params, x=x)
+
+    # Plotting
+    with stage("plot", rows=len(x)):
+        plt.scatter(x, y, label='Data')
+        plt.plot(x, model_function(x, *popt), label='curve_fit', linestyle='--')
+        plt.plot(x, result.best_fit, label='lmfit')
+        plt.legend()
+        plt.show()
+
+    emit("curve_fitting_comparison")
+
+if __name__ == '__main__':
+    main()
@@ -41,6 +41,8 @@ from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 
+from .instrumentation import emit, stage
+
 
 def generate_realistic_stock_data(num_years=6):
     """Generate an hourly stock dataset for `num_years` (weekdays only).
@@ -188,6 +190,10 @@ def save_to_csv(df, filename="simulated_stock_data.csv"):
 
 if __name__ == "__main__":
     # Example usage: generate 1 year of data (weekdays only)
-    df_data = generate_realistic_stock_data(num_years=6)
-    save_to_csv(df_data, "realistic_stock_data.csv")
+    with stage("compute") as s:
+        df_data = generate_realistic_stock_data(num_years=6)
+        s.rows = len(df_data)
+    with stage("save", rows=len(df_data)):
+        save_to_csv(df_data, "realistic_stock_data.csv")
+    emit("gen_syntheticdata")
     print("Simulation complete. Check 'realistic_stock_data.csv' for the output.")
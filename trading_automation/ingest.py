@@ -0,0 +1,310 @@
+"""Concurrent market-data ingestion into the on-disk price store.
+
+Fetches daily or intraday bars for many symbols at once over one pooled
+aiohttp session, instead of one blocking yf.download per ticker. Concurrency,
+request rate and retries are configurable. Each symbol is written as
+<out>/<SYMBOL>.csv, in the layout trading_automation.batch reads.
+
+Usage:
+    python -m trading_automation.ingest AAPL MSFT GC=F --out prices/ --start 2019-01-01 --end 2021-01-01
+    python -m trading_automation.ingest --symbols-file universe.txt --out prices/ --concurrency 16 --rate 8
+
+Responses use the Yahoo Finance chart JSON layout. StubBarServer serves that
+layout from canned DataFrames on localhost, so the pipeline can be exercised
+without network access:
+
+    with StubBarServer({"AAPL": bars}) as server:
+        asyncio.run(ingest(["AAPL"], "prices/", base_url=server.base_url))
+
+aiohttp is only needed for fetching and is imported on first use.
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201, C0415, W0718
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from .barstore import BarStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """A symbol could not be fetched after all retries."""
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all requests.
+
+    Parameters:
+    - rate: Requests per second on average.
+    - burst: Requests allowed at once after an idle period.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def parse_chart(payload):
+    """
+    Convert a chart JSON response into a BarStore.
+
+    Bars with missing prices (halts, partial sessions) are dropped.
+    """
+    chart = payload.get("chart", {})
+    if chart.get("error"):
+        raise FetchError(chart["error"].get("description", chart["error"]))
+    result = chart["result"][0]
+    quote = result["indicators"]["quote"][0]
+
+    df = pd.DataFrame({
+        "time": pd.to_datetime(result.get("timestamp", []), unit="s"),
+        **{field: pd.to_numeric(pd.Series(quote[field], dtype=object), errors="coerce")
+           for field in ("open", "high", "low", "close", "volume") if field in quote},
+    })
+    df = df.dropna(subset=[field for field in ("open", "high", "low", "close") if field in df.columns])
+    return BarStore.from_dataframe(df)
+
+
+def write_bars(store, path):
+    """Write a BarStore as an OHLCV CSV, atomically."""
+    df = store.to_dataframe(style="title", index="range").rename(columns={"time": "Date"})
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+async def fetch_symbol(session, limiter, symbol, params, base_url=DEFAULT_BASE_URL, retries=4, backoff=0.5):
+    """
+    Fetch one symbol's bars, retrying with exponential backoff and jitter.
+
+    Retries on connection errors, timeouts and 429/5xx responses, honouring a
+    Retry-After header when one is sent. Other HTTP errors fail immediately.
+    """
+    import aiohttp
+
+    url = base_url.format(symbol=symbol)
+    for attempt in range(retries + 1):
+        await limiter.acquire()
+        delay = backoff * 2 ** attempt * (0.5 + random.random())
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status in RETRY_STATUSES:
+                    retry_after = response.headers.get("Retry-After")
+                    if retry_after and retry_after.isdigit():
+                        delay = max(delay, float(retry_after))
+                    error = f"HTTP {response.status}"
+                elif response.status >= 400:
+                    raise FetchError(f"{symbol}: HTTP {response.status}")
+                else:
+                    return parse_chart(await response.json(content_type=None))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            error = f"{type(ex).__name__}: {ex}"
+        if attempt < retries:
+            logger.warning(f"{symbol}: {error}, retry {attempt + 1}/{retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+    raise FetchError(f"{symbol}: {error} after {retries + 1} attempts")
+
+
+async def ingest(symbols, out_dir, start=None, end=None, interval="1d", base_url=DEFAULT_BASE_URL,
+                 concurrency=8, rate=5.0, retries=4, backoff=0.5, timeout=30.0):
+    """
+    Fetch `symbols` concurrently and write each to `out_dir`/<SYMBOL>.csv.
+
+    Parameters:
+    - symbols: Ticker symbols.
+    - out_dir: Price store directory.
+    - start, end: Date range, anything pd.Timestamp accepts. Defaults to the last year.
+    - interval: Bar interval understood by the source, e.g. '1d', '1h'.
+    - base_url: URL template with a {symbol} placeholder.
+    - concurrency: Maximum requests in flight, and the connection pool size.
+    - rate: Maximum requests started per second.
+    - retries: Retries per symbol after the first attempt.
+    - backoff: Base delay in seconds, doubled on each retry.
+    - timeout: Total seconds allowed per request.
+
+    Returns:
+    - Dict mapping each symbol to its written row count, or to the exception that stopped it.
+    """
+    import aiohttp
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.now().normalize()
+    start = pd.Timestamp(start) if start is not None else end - pd.Timedelta(days=365)
+    params = {"period1": int(start.timestamp()), "period2": int(end.timestamp()), "interval": interval}
+
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    results = {}
+    done = 0
+
+    async def run(session, symbol):
+        nonlocal done
+        async with semaphore:
+            try:
+                store = await fetch_symbol(session, limiter, symbol, params, base_url, retries, backoff)
+                await asyncio.to_thread(write_bars, store, out_dir / f"{symbol}.csv")
+                results[symbol] = len(store)
+            except Exception as ex:
+                results[symbol] = ex
+        done += 1
+        status = results[symbol] if isinstance(results[symbol], Exception) else f"{results[symbol]} bars"
+        logger.info(f"[{done}/{len(symbols)}] {symbol}: {status}")
+
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        await asyncio.gather(*(run(session, symbol) for symbol in symbols))
+    return results
+
+
+def chart_payload(bars):
+    """Chart JSON for a DataFrame of bars in any supported column spelling."""
+    store = bars if isinstance(bars, BarStore) else BarStore.from_dataframe(bars)
+    timestamps = (store.time // 10**9).tolist() if store.time is not None else list(range(len(store)))
+    quote = {field: np.asarray(getattr(store, field), dtype=float).tolist() for field in store.fields}
+    return {"chart": {"result": [{"timestamp": timestamps, "indicators": {"quote": [quote]}}], "error": None}}
+
+
+class StubBarServer:
+    """
+    Local HTTP server answering chart requests with canned bars.
+
+    Parameters:
+    - bars: Mapping of symbol to a DataFrame or BarStore of bars. Requests are
+      filtered to the period1/period2 range when given.
+    - fail_first: Number of 503 responses returned per symbol before serving
+      data, to exercise retries.
+    - latency: Seconds to wait before answering each request.
+    """
+
+    def __init__(self, bars, fail_first=0, latency=0.0, host="127.0.0.1", port=0):
+        self.payloads = {symbol: chart_payload(frame) for symbol, frame in bars.items()}
+        self.fail_first = fail_first
+        self.latency = latency
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v8/finance/chart/{{symbol}}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                symbol = unquote(url.path.rsplit("/", 1)[-1])
+                with stub._lock:
+                    count = stub.requests[symbol] = stub.requests.get(symbol, 0) + 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if symbol not in stub.payloads:
+                    return self._send(404, {"chart": {"result": None, "error": {"code": "Not Found", "description": f"No data for {symbol}"}}})
+                if count <= stub.fail_first:
+                    return self._send(503, {"error": "unavailable"})
+                return self._send(200, stub._filtered(symbol, parse_qs(url.query)))
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # noqa: A002
+                pass  # Keep test output quiet
+
+        return Handler
+
+    def _filtered(self, symbol, query):
+        payload = self.payloads[symbol]
+        if "period1" not in query:
+            return payload
+        lo, hi = int(query["period1"][0]), int(query.get("period2", [2**62])[0])
+        result = payload["chart"]["result"][0]
+        keep = [i for i, ts in enumerate(result["timestamp"]) if lo <= ts < hi]
+        quote = {field: [values[i] for i in keep] for field, values in result["indicators"]["quote"][0].items()}
+        return {"chart": {"result": [{"timestamp": [result["timestamp"][i] for i in keep],
+                                      "indicators": {"quote": [quote]}}], "error": None}}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch bars for many symbols concurrently into a price directory.")
+    parser.add_argument("symbols", nargs="*", help="Ticker symbols")
+    parser.add_argument("--symbols-file", help="File with one symbol per line")
+    parser.add_argument("--out", required=True, help="Price store directory")
+    parser.add_argument("--start", help="Start date (default: one year before --end)")
+    parser.add_argument("--end", help="End date (default: today)")
+    parser.add_argument("--interval", default="1d", help="Bar interval (default: 1d)")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="URL template with a {symbol} placeholder")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight (default: 8)")
+    parser.add_argument("--rate", type=float, default=5.0, help="Requests per second (default: 5)")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per symbol (default: 4)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    symbols = list(args.symbols)
+    if args.symbols_file:
+        with open(args.symbols_file, encoding="utf-8") as fh:
+            symbols += [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+    if not symbols:
+        parser.error("no symbols given")
+
+    results = asyncio.run(ingest(symbols, args.out, start=args.start, end=args.end, interval=args.interval,
+                                 base_url=args.base_url, concurrency=args.concurrency, rate=args.rate,
+                                 retries=args.retries))
+    failed = [symbol for symbol, result in results.items() if isinstance(result, Exception)]
+    logger.info(f"Fetched {len(results) - len(failed)} of {len(results)} symbols")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+"""Opt-in stage timing and memory instrumentation.
+
+Instrumentation is off unless the TRADING_METRICS environment variable is set
+to a non-empty value other than "0", or enable() is called. While off,
+stage() returns a shared no-op context manager and timed() calls straight
+through, so instrumented code pays for one flag check per stage.
+
+While on, every stage records wall time, CPU time, the peak of memory traced
+by tracemalloc (NumPy and pandas buffers included), how far that peak rose
+above the memory in use when the stage started, and an optional row count.
+emit() writes the run's stages as one JSON object, appended as a line to
+TRADING_METRICS_FILE if set and printed to stderr otherwise.
+
+    with stage("load") as s:
+        df = pd.read_csv(path)
+        s.rows = len(df)
+
+    @timed("plot")
+    def plot_signals(...): ...
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201, W0603
+
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+_enabled = os.environ.get("TRADING_METRICS", "") not in ("", "0")
+_records = []
+_stack = []
+
+
+def enable(flag=True):
+    """Switch instrumentation on or off for this process."""
+    global _enabled
+    _enabled = flag
+    if flag and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not flag and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled():
+    return _enabled
+
+
+class _NullStage:
+    """Stand-in returned while instrumentation is disabled."""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass  # Discard rows assigned inside a disabled stage
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Stage:
+    """Context manager recording one stage. Use through stage()."""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self._child_peak = 0
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # Nested stages reset the tracemalloc peak, so remember what they saw
+        self._parent = _stack[-1] if _stack else None
+        if self._parent is not None:
+            self._parent._child_peak = max(self._parent._child_peak, tracemalloc.get_traced_memory()[1])
+        _stack.append(self)
+        tracemalloc.reset_peak()
+        self._mem = tracemalloc.get_traced_memory()[0]
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak = max(tracemalloc.get_traced_memory()[1], self._child_peak)
+        _stack.pop()
+        if self._parent is not None:
+            self._parent._child_peak = max(self._parent._child_peak, peak)
+
+        record = {
+            "stage": self.name,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_mem_bytes": peak,
+            "peak_alloc_bytes": max(peak - self._mem, 0),
+            "rows": self.rows,
+            "depth": len(_stack),
+            "ok": exc_type is None,
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _records.append(record)
+        return False
+
+
+def stage(name, rows=None):
+    """Time the enclosed block as stage `name`. Set `.rows` on the result to record a row count."""
+    if not _enabled:
+        return _NULL_STAGE
+    return Stage(name, rows)
+
+
+def _count_rows(result):
+    shape = getattr(result, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+def timed(name=None, rows=_count_rows):
+    """
+    Decorator recording each call of the wrapped function as a stage.
+
+    Parameters:
+    - name: Stage name, defaults to the function name.
+    - rows: Callable mapping the return value to a row count. The default
+      uses the first dimension of array-like results.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Stage(stage_name) as s:
+                result = func(*args, **kwargs)
+                s.rows = rows(result) if rows else None
+            return result
+        return wrapper
+    return decorator
+
+
+def records():
+    """Stages recorded since the last emit(), oldest first."""
+    return list(_records)
+
+
+def emit(run, path=None, **meta):
+    """
+    Write the stages recorded so far as one JSON document and clear them.
+
+    Parameters:
+    - run: Name of the script or job the stages belong to.
+    - path: File to append the JSON line to, defaults to TRADING_METRICS_FILE.
+    - meta: Extra fields stored alongside the stages, e.g. the input file.
+
+    Returns:
+    - The emitted document, or None when instrumentation is disabled.
+    """
+    if not _enabled:
+        return None
+    doc = {
+        "run": run,
+        "pid": os.getpid(),
+        "emitted_at": datetime.now(timezone.utc).isoformat(),
+        **meta,
+        "total_wall_s": round(sum(r["wall_s"] for r in _records if r["depth"] == 0), 6),
+        "stages": list(_records),
+    }
+    _records.clear()
+
+    path = path or os.environ.get("TRADING_METRICS_FILE")
+    line = json.dumps(doc, default=str)
+    if path:
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+    else:
+        print(line, file=sys.stderr)
+    return doc
+
+
+if _enabled:
+    tracemalloc.start()
@@ -16,14 +16,20 @@ SOFTWARE.
 
 import logging
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import yfinance as yf  # fix_yahoo_finance is deprecated
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from .backtest import evaluate_positions
+from .instrumentation import emit, stage, timed
 
+# Acceleration factor parameters
+INITIAL_AF = 0.02
+STEP_AF = 0.02
+END_AF = 0.2
+
+SAR_COLUMNS = ['trend', 'sar', 'real_sar', 'ep', 'af']
+
+@timed("compute")
 def parabolic_sar(stock_data):
     """
     Calculate Parabolic SAR for a given stock data.
@@ -34,23 +40,40 @@ def parabolic_sar(stock_data):
     Returns:
     DataFrame: Input DataFrame with additional columns for 'trend', 'sar', 'real_sar', 'ep', and 'af'.
     """
-    # Initial parameters
-    initial_af = 0.02
-    step_af = 0.02
-    end_af = 0.2
-
     # Adding necessary columns
-    for column in ['trend', 'sar', 'real_sar', 'ep', 'af']:
+    for column in SAR_COLUMNS:
         stock_data[column] = 0.0
 
     stock_data.at[1, 'trend'] = 1 if stock_data['Close'].iloc[1] > stock_data['Close'].iloc[0] else -1
     stock_data.at[1, 'sar'] = stock_data['High'].iloc[0] if stock_data['trend'].iloc[1] > 0 else stock_data['Low'].iloc[0]
     stock_data.at[1, 'real_sar'] = stock_data['sar'].iloc[1]
     stock_data.at[1, 'ep'] = stock_data['High'].iloc[1] if stock_data['trend'].iloc[1] > 0 else stock_data['Low'].iloc[1]
-    stock_data.at[1, 'af'] = initial_af
+    stock_data.at[1, 'af'] = INITIAL_AF
+
+    return _sar_loop(stock_data, 2)
+
+def extend_parabolic_sar(stock_data, start):
+    """
+    Continue a Parabolic SAR calculation from row `start`.
+
+    Each SAR row depends only on earlier rows, so for append-only data the
+    rows before `start` can come from an earlier run and only the tail is
+    computed.
+
+    Parameters:
+    stock_data (DataFrame): 'High', 'Low' and 'Close' columns, with the SAR columns filled in for rows before `start`.
+    start (int): First row to compute, at least 2.
 
+    Returns:
+    DataFrame: stock_data with the SAR columns filled in from `start` onwards.
+    """
+    if start < 2:
+        return parabolic_sar(stock_data)
+    return _sar_loop(stock_data, start)
+
+def _sar_loop(stock_data, start):
     # SAR calculation loop
-    for i in range(2, len(stock_data)):
+    for i in range(start, len(stock_data)):
         temp = stock_data.at[i - 1, 'sar'] + stock_data.at[i - 1, 'af'] * (stock_data.at[i - 1, 'ep'] - stock_data.at[i - 1, 'sar'])
         if stock_data.at[i - 1, 'trend'] < 0:
             stock_data.at[i, 'sar'] = max(temp, stock_data['High'].iloc[i - 1], stock_data['High'].iloc[i - 2])
@@ -67,9 +90,9 @@ def parabolic_sar(stock_data):
         stock_data.at[i, 'ep'] = temp_ep
 
         if abs(stock_data.at[i, 'trend']) == 1:
-            stock_data.at[i, 'af'] = initial_af
+            stock_data.at[i, 'af'] = INITIAL_AF
         else:
-            stock_data.at[i, 'af'] = min(end_af, stock_data.at[i - 1, 'af'] + step_af)
+            stock_data.at[i, 'af'] = min(END_AF, stock_data.at[i - 1, 'af'] + STEP_AF)
 
         stock_data.at[i, 'real_sar'] = temp
 
@@ -101,6 +124,8 @@ def plot_signals(processed_data, ticker):
     processed_data (DataFrame): DataFrame with 'Close', 'real_sar', and 'signals'.
     ticker (str): Stock ticker symbol.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(14, 7))
     plt.plot(processed_data['Close'], label=f'{ticker} Close Price', lw=2)
     plt.plot(processed_data['real_sar'], linestyle=':', label='Parabolic SAR', color='k')
@@ -117,25 +142,40 @@ def main():
     """
     Main function to execute the script logic.
     """
+    import yfinance as yf  # fix_yahoo_finance is deprecated
+
+    # Configure basic logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     ticker = 'AAPL'
     start_date = '2019-01-01'
     end_date = '2021-01-01'
 
     logging.info(f'Downloading {ticker} stock data from {start_date} to {end_date}')
-    df = yf.download(ticker, start=start_date, end=end_date)
+    with stage("load") as s:
+        df = yf.download(ticker, start=start_date, end=end_date)
 
-    # Preprocessing data
-    df.reset_index(inplace=True)
-    df.drop(['Adj Close', 'Volume'], axis=1, inplace=True)
+        # Preprocessing data
+        df.reset_index(inplace=True)
+        df.drop(['Adj Close', 'Volume'], axis=1, inplace=True)
+        s.rows = len(df)
 
     logging.info('Generating trading signals...')
-    signals_data = signal_generation(df, parabolic_sar)
+    with stage("signal", rows=len(df)):
+        signals_data = signal_generation(df, parabolic_sar)
+
+    with stage("backtest", rows=len(signals_data)):
+        stats, _ = evaluate_positions(signals_data['Close'], signals_data['positions'])
+    logging.info(f'Backtest: {stats.iloc[0].round(4).to_dict()}')
 
     # Setting index as date for plotting
     signals_data.set_index('Date', inplace=True)
 
     logging.info('Plotting trading signals...')
-    plot_signals(signals_data.iloc[-450:], ticker)
+    with stage("plot", rows=450):
+        plot_signals(signals_data.iloc[-450:], ticker)
+
+    emit("parabolic_sar", ticker=ticker)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,286 @@
+"""Streaming tick-to-bar aggregation feeding incremental indicators.
+
+BarAggregator consumes raw mid-price ticks and builds OHLC bars for several
+timeframes at once. Completed bars go into fixed-size ring buffers and are
+pushed to the consumers registered for that timeframe the moment they close,
+so live analysis never has to dump bars to CSV and read them back. Every tick's
+processing time, consumer callbacks included, is recorded for latency
+reporting.
+
+    agg = BarAggregator(["1min", "5min"], capacity=2048)
+    sar = IncrementalParabolicSar()
+    agg.subscribe("1min", sar)
+    agg.subscribe("5min", lambda bar: print(bar))
+    for ts, bid, ask in feed:
+        agg.on_tick(ts, bid=bid, ask=ask)
+    agg.latency_stats()
+    agg.snapshot_frame("1min")   # snapshotTime, mid_open, mid_high, mid_low, mid_close
+
+The incremental consumers reproduce the batch functions bar by bar:
+IncrementalParabolicSar matches parabolic_sar, IncrementalSutte matches
+calculate_sutte and IncrementalAngle matches angle_variation.calculate_angles.
+"""
+
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0621, W1203, C0103, C0301, W1201
+
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .barstore import BarStore
+from .psar import END_AF, INITIAL_AF, STEP_AF
+
+Bar = namedtuple("Bar", ["timeframe", "time", "open", "high", "low", "close", "ticks"])
+
+
+def _timeframe_ns(timeframe):
+    """Bar length in nanoseconds from seconds or a pandas offset string such as '5min'."""
+    if isinstance(timeframe, (int, float)):
+        return int(timeframe * 1e9)
+    return int(pd.Timedelta(timeframe).value)
+
+
+def _epoch_ns(ts):
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    return pd.Timestamp(ts).value
+
+
+class RingBuffer:
+    """
+    Fixed-capacity store of the most recent bars, oldest overwritten first.
+
+    Parameters:
+    - capacity: Number of bars kept.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.time = np.zeros(capacity, dtype=np.int64)
+        self.prices = np.zeros((4, capacity), dtype=np.float64)
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self._next = 0
+        self._count = 0
+
+    def append(self, bar):
+        i = self._next
+        self.time[i] = bar.time
+        self.prices[:, i] = bar.open, bar.high, bar.low, bar.close
+        self.ticks[i] = bar.ticks
+        self._next = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def __len__(self):
+        return self._count
+
+    def _order(self):
+        start = (self._next - self._count) % self.capacity
+        return (start + np.arange(self._count)) % self.capacity
+
+    def to_store(self):
+        """Bars oldest first as a BarStore (a copy, since the ring wraps)."""
+        order = self._order()
+        return BarStore(self.time[order], *self.prices[:, order])
+
+
+class BarAggregator:
+    """
+    Build OHLC bars from ticks at several timeframes at once.
+
+    Bars are aligned to the epoch, so a 5min bar starts on a multiple of five
+    minutes. A bar closes when the first tick of a later bar arrives, or on
+    flush(). A tick older than the open bar of any timeframe is counted once
+    in `late_ticks` and dropped from every timeframe, so all timeframes are
+    built from the same ticks. A tick that arrives out of order but still
+    inside the open bars widens their high and low, and only replaces the
+    open or close when it is earlier or later than every tick seen so far.
+
+    Parameters:
+    - timeframes: Bar lengths as pandas offset strings ('1min', '1h') or seconds.
+    - capacity: Completed bars kept per timeframe.
+    - latency_capacity: Most recent per-tick latencies kept for latency_stats().
+    """
+
+    def __init__(self, timeframes, capacity=1024, latency_capacity=65536):
+        self.timeframes = list(timeframes)
+        self._sizes = [_timeframe_ns(tf) for tf in self.timeframes]
+        self.buffers = {tf: RingBuffer(capacity) for tf in self.timeframes}
+        self._consumers = {tf: [] for tf in self.timeframes}
+        # Open bar per timeframe: [start, open, high, low, close, ticks, first tick time, last tick time]
+        self._open = [None] * len(self.timeframes)
+        self._latency = np.zeros(latency_capacity, dtype=np.int64)
+        self._n_ticks = 0
+        self.late_ticks = 0
+
+    def subscribe(self, timeframe, consumer):
+        """
+        Call `consumer` with each completed Bar of `timeframe`.
+
+        `consumer` is a callable or an object with an on_bar(bar) method.
+        """
+        if timeframe not in self._consumers:
+            raise KeyError(f"Unknown timeframe {timeframe!r}, expected one of {self.timeframes}")
+        self._consumers[timeframe].append(getattr(consumer, "on_bar", consumer))
+
+    def on_tick(self, ts, price=None, bid=None, ask=None):
+        """
+        Add one tick.
+
+        Parameters:
+        - ts: Epoch nanoseconds, datetime or pd.Timestamp.
+        - price: Mid price. Alternatively pass `bid` and `ask`.
+        """
+        started = time.perf_counter_ns()
+        if price is None:
+            price = (bid + ask) / 2
+        t = _epoch_ns(ts)
+        starts = [t - t % size for size in self._sizes]
+
+        if any(bar is not None and start < bar[0] for bar, start in zip(self._open, starts)):
+            self.late_ticks += 1
+        else:
+            for k, start in enumerate(starts):
+                bar = self._open[k]
+                if bar is None or start > bar[0]:
+                    if bar is not None:
+                        self._close(k, bar)
+                    self._open[k] = [start, price, price, price, price, 1, t, t]
+                    continue
+                if price > bar[2]:
+                    bar[2] = price
+                elif price < bar[3]:
+                    bar[3] = price
+                if t < bar[6]:
+                    bar[1], bar[6] = price, t
+                if t >= bar[7]:
+                    bar[4], bar[7] = price, t
+                bar[5] += 1
+
+        self._latency[self._n_ticks % len(self._latency)] = time.perf_counter_ns() - started
+        self._n_ticks += 1
+
+    def _close(self, k, state):
+        tf = self.timeframes[k]
+        bar = Bar(tf, *state[:6])
+        self.buffers[tf].append(bar)
+        for consumer in self._consumers[tf]:
+            consumer(bar)
+
+    def flush(self):
+        """Close every open bar, e.g. at the end of a session."""
+        for k, state in enumerate(self._open):
+            if state is not None:
+                self._close(k, state)
+                self._open[k] = None
+
+    def bars(self, timeframe):
+        """Completed bars of `timeframe`, oldest first, as a BarStore."""
+        return self.buffers[timeframe].to_store()
+
+    def snapshot_frame(self, timeframe):
+        """Completed bars in the snapshotTime / mid_* layout of the streaming price API."""
+        df = self.bars(timeframe).to_dataframe(style="mid", index="range")
+        return df.rename(columns={"time": "snapshotTime"})
+
+    def latency_stats(self):
+        """Per-tick processing latency in microseconds over the retained ticks."""
+        n = min(self._n_ticks, len(self._latency))
+        if n == 0:
+            return {"ticks": 0}
+        us = self._latency[:n] / 1e3
+        p50, p90, p99 = np.percentile(us, [50, 90, 99])
+        return {
+            "ticks": self._n_ticks,
+            "mean_us": float(us.mean()),
+            "p50_us": float(p50),
+            "p90_us": float(p90),
+            "p99_us": float(p99),
+            "max_us": float(us.max()),
+        }
+
+
+class IncrementalSutte:
+    """Sutte boundaries updated on each bar, as calculate_sutte computes them."""
+
+    def __init__(self):
+        self.prev_close = math.nan
+        self.low = self.high = self.pred = math.nan
+
+    def on_bar(self, bar):
+        mid = (bar.close + self.prev_close) / 2
+        self.low = mid + (bar.low - bar.close)
+        self.high = mid + (bar.high - bar.close)
+        self.pred = (self.low + self.high) / 2
+        self.prev_close = bar.close
+        return self.low, self.high, self.pred
+
+
+class IncrementalAngle:
+    """Close-to-close angle per bar, as angle_variation.calculate_angles computes it."""
+
+    def __init__(self):
+        self.index = 0
+        self.prev_close = None
+        self.angle = math.nan
+
+    def on_bar(self, bar):
+        delta_y = 0.0 if self.prev_close is None else bar.close - self.prev_close
+        self.angle = round(math.degrees(math.atan2(delta_y, self.index)), 2)
+        self.prev_close = bar.close
+        self.index += 1
+        return self.angle
+
+
+class IncrementalParabolicSar:
+    """
+    Parabolic SAR updated on each bar with the same recurrence as parabolic_sar.
+
+    After each bar, `trend`, `sar`, `real_sar`, `ep`, `af` hold that bar's
+    values and `position` is 1 when real_sar is below the close, as in
+    signal_generation.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.trend = self.sar = self.real_sar = self.ep = self.af = 0.0
+        self.position = 0
+        self._highs = []
+        self._lows = []
+        self._prev_close = None
+
+    def on_bar(self, bar):
+        high, low = bar.high, bar.low
+        if self.n == 1:
+            self.trend = 1 if bar.close > self._prev_close else -1
+            self.sar = self._highs[-1] if self.trend > 0 else self._lows[-1]
+            self.real_sar = self.sar
+            self.ep = high if self.trend > 0 else low
+            self.af = INITIAL_AF
+        elif self.n >= 2:
+            temp = self.sar + self.af * (self.ep - self.sar)
+            if self.trend < 0:
+                self.sar = max(temp, self._highs[-1], self._highs[-2])
+                trend = 1 if self.sar < high else self.trend - 1
+            else:
+                self.sar = min(temp, self._lows[-1], self._lows[-2])
+                trend = -1 if self.sar > low else self.trend + 1
+            self.trend = trend
+
+            if trend < 0:
+                self.ep = min(low, self.ep) if trend != -1 else low
+            else:
+                self.ep = max(high, self.ep) if trend != 1 else high
+
+            self.af = INITIAL_AF if abs(trend) == 1 else min(END_AF, self.af + STEP_AF)
+            self.real_sar = temp
+
+        self.position = 1 if self.real_sar < bar.close else 0
+        self._highs = [*self._highs[-1:], high]
+        self._lows = [*self._lows[-1:], low]
+        self._prev_close = bar.close
+        self.n += 1
+        return self.real_sar
@@ -23,10 +23,10 @@ SOFTWARE.
 # Status : Production
 # Copyright : Copyright (c) 2024 James Sawyer
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import ruptures as rpt
+
+from .instrumentation import emit, stage
 
 date_format = "%Y:%m:%d-%H:%M:%S"
 
@@ -52,6 +52,8 @@ def estimate_n_bkps(points):
 
 
 def detect_change_points(points, method):
+    import ruptures as rpt
+
     if method == "Pelt":
         return None  # Pelt does not have predict method
     elif method == "Dynp":
@@ -111,9 +113,13 @@ def plot_change_points(ax, points, bkps, method_name, is_best_method):
 
 
 def main():
+    import matplotlib.pyplot as plt
+
     csv_file = "backtest_prices.csv"
-    stock_data = get_stock_data(csv_file)
-    points = np.array(stock_data["price"])
+    with stage("load") as s:
+        stock_data = get_stock_data(csv_file)
+        points = np.array(stock_data["price"])
+        s.rows = len(points)
 
     methods = ["Pelt", "Binseg", "Window", "Dynp"]
 
@@ -121,37 +127,46 @@ def main():
     n_cols = 2
     n_rows = (n_methods + 1) // n_cols  # Round up to the nearest integer
 
+    with stage("compute", rows=len(points)):
+        method_bkps = {method: detect_change_points(points, method) for method in methods}
+
     best_method = None
     best_score = float("-inf")
-
-    fig, axs = plt.subplots(n_rows, n_cols, figsize=(12, 6 * n_rows), squeeze=False)
-    for i, method in enumerate(methods):
-        bkps = detect_change_points(points, method)
-        row, col = i // n_cols, i % n_cols
-        is_best_method = False
-        if bkps is not None:
-            score = score_method(points, bkps)
-            if score > best_score:
-                best_score = score
-                best_method = method
-                is_best_method = True
-        plot_change_points(axs[row, col], points, bkps, method, is_best_method)
-
-    # Remove empty subplots if any
-    for i in range(n_methods, n_rows * n_cols):
-        fig.delaxes(axs.flatten()[i])
-
-    up_points, down_points = extract_up_down_points(points, bkps)
-    for ax in axs.flatten():
-        for p in up_points:
-            ax.plot(p[0], p[1], marker="o", markersize=5, color="green")
-        for p in down_points:
-            ax.plot(p[0], p[1], marker="o", markersize=5, color="red")
-
-    plt.tight_layout()
-    plt.show()
+    is_best = {}
+
+    with stage("signal", rows=len(points)):
+        for method, bkps in method_bkps.items():
+            is_best[method] = False
+            if bkps is not None:
+                score = score_method(points, bkps)
+                if score > best_score:
+                    best_score = score
+                    best_method = method
+                    is_best[method] = True
+
+        up_points, down_points = extract_up_down_points(points, bkps)
+
+    with stage("plot"):
+        fig, axs = plt.subplots(n_rows, n_cols, figsize=(12, 6 * n_rows), squeeze=False)
+        for i, method in enumerate(methods):
+            row, col = i // n_cols, i % n_cols
+            plot_change_points(axs[row, col], points, method_bkps[method], method, is_best[method])
+
+        # Remove empty subplots if any
+        for i in range(n_methods, n_rows * n_cols):
+            fig.delaxes(axs.flatten()[i])
+
+        for ax in axs.flatten():
+            for p in up_points:
+                ax.plot(p[0], p[1], marker="o", markersize=5, color="green")
+            for p in down_points:
+                ax.plot(p[0], p[1], marker="o", markersize=5, color="red")
+
+        plt.tight_layout()
+        plt.show()
 
     print(f"The best method for capturing changes is: {best_method}")
+    emit("structural_break", input=csv_file)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,9 @@
 import numpy as np
 import pandas as pd
-from sklearn.cluster import MeanShift, estimate_bandwidth
 import logging
-import matplotlib.pyplot as plt  # Import for plotting
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from .instrumentation import emit, stage
+
 logger = logging.getLogger(__name__)
 
 def get_cluster(df, col, quantile, samples):
@@ -21,6 +19,8 @@ def get_cluster(df, col, quantile, samples):
     Returns:
     - List of cluster pivots.
     """
+    from sklearn.cluster import MeanShift, estimate_bandwidth
+
     data = df[col].values.reshape(-1, 1)
     try:
         bandwidth = estimate_bandwidth(data, quantile=quantile, n_samples=samples)
@@ -86,28 +86,39 @@ def get_sure_OHLC(df, intervals, n=2, quantile=0.05, samples=None, up_thresh=0.0
     return df, su, re
     
 def main():
+    import matplotlib.pyplot as plt  # Import for plotting
+
+    # Configure logging
+    logging.basicConfig(level=logging.INFO)
+
     # Read data from CSV into DataFrame
-    df = pd.read_csv('backtest_prices.csv')  # Update with your CSV file path
-    # Assuming CSV contains 'close' column
-    # rename any columns if necessary
-    # remove mid_ from column names
-    df = df.rename(columns={c: c.replace('mid_', '') for c in df.columns})
+    with stage("load") as st:
+        df = pd.read_csv('backtest_prices.csv')  # Update with your CSV file path
+        # Assuming CSV contains 'close' column
+        # rename any columns if necessary
+        # remove mid_ from column names
+        df = df.rename(columns={c: c.replace('mid_', '') for c in df.columns})
+        st.rows = len(df)
 
     # Calculate support and resistance levels
-    df, su, re = get_sure_OHLC(df, intervals=['1', '2', '3'])
+    with stage("compute", rows=len(df)):
+        df, su, re = get_sure_OHLC(df, intervals=['1', '2', '3'])
 
     # Plot data with support and resistance lines
-    plt.figure(figsize=(10, 6))
-    plt.plot(df['close'], label='Close Price')
-    for s in su:
-        plt.axhline(y=s, color='g', linestyle='--', alpha=0.5, label='Support')
-    for r in re:
-        plt.axhline(y=r, color='r', linestyle='--', alpha=0.5, label='Resistance')
-    plt.xlabel('Date')
-    plt.ylabel('Price')
-    plt.title('Support and Resistance Levels')
-    plt.legend()
-    plt.show()
+    with stage("plot", rows=len(df)):
+        plt.figure(figsize=(10, 6))
+        plt.plot(df['close'], label='Close Price')
+        for s in su:
+            plt.axhline(y=s, color='g', linestyle='--', alpha=0.5, label='Support')
+        for r in re:
+            plt.axhline(y=r, color='r', linestyle='--', alpha=0.5, label='Resistance')
+        plt.xlabel('Date')
+        plt.ylabel('Price')
+        plt.title('Support and Resistance Levels')
+        plt.legend()
+        plt.show()
+
+    emit("support_resistance_analysis")
 
 if __name__ == "__main__":
     main()
@@ -28,7 +28,8 @@ the script.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from .instrumentation import emit, stage
 
 
 # Example Sutte calculation function (as provided)
@@ -64,41 +65,64 @@ def calculate_sutte(data):
     return data
 
 
-# ---------------------------
-# Create Sample Data
-# ---------------------------
-np.random.seed(42)  # For reproducible results
-dates = pd.date_range(start="2021-01-01", periods=100, freq="D")
-close_prices = np.cumsum(np.random.randn(100)) + 100  # Simulated closing prices
-high_prices = close_prices + np.random.uniform(
-    0.5, 1.5, size=100
-)  # High prices a bit above close
-low_prices = close_prices - np.random.uniform(
-    0.5, 1.5, size=100
-)  # Low prices a bit below close
-
-data = pd.DataFrame(
-    {"close": close_prices, "high": high_prices, "low": low_prices}, index=dates
-)
-
-# Calculate the Sutte Indicators
-data = calculate_sutte(data)
-
-# ---------------------------
-# Plot the Results
-# ---------------------------
-plt.figure(figsize=(12, 6))
-plt.plot(data.index, data["close"], label="Close Price", color="blue")
-plt.plot(data.index, data["sutte%l"], label="SUTTE%L", color="green", linestyle="--")
-plt.plot(data.index, data["sutte%h"], label="SUTTE%H", color="red", linestyle="--")
-plt.plot(
-    data.index, data["sutte-pred"], label="SUTTE-PRED", color="purple", linestyle=":"
-)
-
-plt.title("Sutte Indicator Example")
-plt.xlabel("Date")
-plt.ylabel("Price")
-plt.grid(True)
-plt.legend()
-plt.tight_layout()
-plt.show()
+def generate_sample_data(periods=100):
+    """Simulate close prices with highs and lows a little either side."""
+    np.random.seed(42)  # For reproducible results
+    dates = pd.date_range(start="2021-01-01", periods=periods, freq="D")
+    close_prices = np.cumsum(np.random.randn(periods)) + 100  # Simulated closing prices
+    high_prices = close_prices + np.random.uniform(
+        0.5, 1.5, size=periods
+    )  # High prices a bit above close
+    low_prices = close_prices - np.random.uniform(
+        0.5, 1.5, size=periods
+    )  # Low prices a bit below close
+
+    return pd.DataFrame(
+        {"close": close_prices, "high": high_prices, "low": low_prices}, index=dates
+    )
+
+
+def plot_sutte(data):
+    """Plot the close price with the Sutte boundaries and prediction."""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    plt.plot(data.index, data["close"], label="Close Price", color="blue")
+    plt.plot(data.index, data["sutte%l"], label="SUTTE%L", color="green", linestyle="--")
+    plt.plot(data.index, data["sutte%h"], label="SUTTE%H", color="red", linestyle="--")
+    plt.plot(
+        data.index, data["sutte-pred"], label="SUTTE-PRED", color="purple", linestyle=":"
+    )
+
+    plt.title("Sutte Indicator Example")
+    plt.xlabel("Date")
+    plt.ylabel("Price")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    plt.show()
+
+
+def main():
+    # ---------------------------
+    # Create Sample Data
+    # ---------------------------
+    with stage("load") as s:
+        data = generate_sample_data()
+        s.rows = len(data)
+
+    # Calculate the Sutte Indicators
+    with stage("compute", rows=len(data)):
+        data = calculate_sutte(data)
+
+    # ---------------------------
+    # Plot the Results
+    # ---------------------------
+    with stage("plot", rows=len(data)):
+        plot_sutte(data)
+
+    emit("sutte_indicator_example")
+
+
+if __name__ == "__main__":
+    main()